@@ -36,16 +36,19 @@ Assumptions (from live DB):
 This module avoids dynamic column lists and ensures commits.
 """
 from __future__ import annotations
-import os, time, uuid, json, sqlite3
-from typing import Dict, Any, Tuple, Optional
+import os, time, uuid, json, sqlite3, atexit, threading, functools
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Tuple, Optional, Iterator, Iterable, Union
 
 from web3 import Web3
+from eth_abi import encode as abi_encode
 from eth_account import Account
 
 # ---------- Optional imports from runner.py ----------
 try:
     from .runner import (
-        MIN_ABI, _fee_params, _send_signed,
+        MIN_ABI, _fee_params, _sign_raw, _wait_receipt, _wait_receipts,
         TOKEN_DECIMALS_DEFAULT as DEC_FALLBACK,
         GAS_LIMIT_NATIVE_XFER, GAS_LIMIT_ERC20_TRANSFER,
     )
@@ -93,18 +96,25 @@ except Exception:
         tip = getattr(w3.eth, "max_priority_fee", w3.eth.gas_price // 10_000 or 1)
         return int(base + tip * 2), int(tip)
 
-    def _send_signed(w3: Web3, tx: dict, pk: str):
-        signed = w3.eth.account.sign_transaction(tx, private_key=pk)
-        txh = w3.eth.send_raw_transaction(signed.raw_transaction)
+    def _sign_raw(w3: Web3, tx: dict, pk: str) -> bytes:
+        return w3.eth.account.sign_transaction(tx, private_key=pk).raw_transaction
+
+    def _wait_receipt(w3: Web3, txh):
         rcpt = w3.eth.wait_for_transaction_receipt(txh, timeout=240)
         if rcpt.status != 1:
             raise RuntimeError(f"Tx failed: {txh.hex()}")
-        return txh.hex(), rcpt
+        return rcpt
+
+    def _wait_receipts(w3: Web3, hashes: list) -> list:
+        return [_wait_receipt(w3, h) for h in hashes]
 
     DEC_FALLBACK = 6
     GAS_LIMIT_NATIVE_XFER = 21_000
     GAS_LIMIT_ERC20_TRANSFER = 120_000
 
+from ..util.db import open_db
+from ..util.rpc import http_provider
+
 # ---------- LLM handler (optional) ----------
 try:
     from ..llm_handler import call_LLM as CALL_LLM
@@ -132,25 +142,130 @@ B_PK = os.getenv(
 C_ADDR = Web3.to_checksum_address(os.getenv("C_ADDR", "0x884c9339e1765511b02f6C8e3D7d365d396D14C1"))
 
 NEG_SIM = int(os.getenv("NEGOTIATION_SIMULATE", "0"))  # 1=skip LLM, produce deterministic script
+# Optional separate file for the (non-critical) negotiation trail, written with
+# synchronous=OFF. Leave unset to keep it in DB_PATH, which is what
+# /api/mon/deals reads.
+NEG_LOG_DB_PATH = os.getenv("NEG_LOG_DB_PATH", "")
+
+# ---------- Long-lived chain handles ----------
+
+@functools.lru_cache(maxsize=1)
+def _chain() -> Tuple[Web3, Any, Any, Any, Any]:
+    """
+    ``(W3, TOKEN, DEPLOYER, A_ACCT, B_ACCT)``, built on first use and kept for
+    the process so key derivation and provider/session setup are not repeated
+    for every deal. A bad key or unreachable RPC fails the first deal, not the
+    import, and (not being cached) is retried on the next one.
+    """
+    w3 = Web3(http_provider(RPC_URL))
+    if not w3.is_connected():
+        raise RuntimeError(f"RPC not reachable: {RPC_URL}")
+    token = w3.eth.contract(address=TOKEN_ADDR, abi=MIN_ABI)
+    return (
+        w3,
+        token,
+        Account.from_key(DEPLOYER_PK),
+        Account.from_key(A_PK),
+        Account.from_key(B_PK),
+    )
 
 # ---------- DB helpers ----------
 
-def _db_conn() -> sqlite3.Connection:
-    os.makedirs(os.path.dirname(os.path.abspath(DB_PATH)), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+_LOCAL = threading.local()
+_OPEN_CONNS: list = []
+_DB_DIR_READY = False
+
+
+def _ensure_db_dir() -> None:
+    global _DB_DIR_READY
+    if not _DB_DIR_READY:
+        os.makedirs(os.path.dirname(os.path.abspath(DB_PATH)), exist_ok=True)
+        _DB_DIR_READY = True
+
+
+def _db() -> sqlite3.Connection:
+    """Return this thread's shared connection, opening it on first use."""
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is None:
+        _ensure_db_dir()
+        # Autocommit at the driver level; writers open explicit transactions.
+        conn = open_db(DB_PATH, isolation_level=None, row_factory=sqlite3.Row)
+        if NEG_LOG_DB_PATH:
+            _attach_neg_log(conn)
+        _LOCAL.conn = conn
+        _OPEN_CONNS.append(conn)
     return conn
 
 
+def _attach_neg_log(conn: sqlite3.Connection) -> None:
+    """Attach NEG_LOG_DB_PATH as ``neg``; losing its last writes on a crash is acceptable."""
+    conn.execute("ATTACH DATABASE ? AS neg", (NEG_LOG_DB_PATH,))
+    conn.execute("PRAGMA neg.journal_mode=WAL")
+    conn.execute("PRAGMA neg.synchronous=OFF")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS neg.negotiation_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            payer TEXT,
+            vendor TEXT,
+            auditor TEXT,
+            transcript TEXT,
+            final_settlement TEXT
+        )
+        """
+    )
+
+
+@atexit.register
+def _close_db() -> None:
+    while _OPEN_CONNS:
+        try:
+            _OPEN_CONNS.pop().close()
+        except Exception:
+            pass
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Run the enclosed writes as one transaction (single commit/fsync). IMMEDIATE
+    takes the write lock up front instead of upgrading a reader mid-transaction,
+    which avoids SQLITE_BUSY under concurrent WAL writers.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _now() -> int:
+    """Current unix time in whole seconds, without a float round-trip."""
+    return time.time_ns() // 1_000_000_000
+
+
+def _to_json(obj: Union[dict, str, None]) -> Optional[str]:
+    """Serialize ``obj`` unless the caller already passed the JSON text."""
+    # JSON columns stay TEXT (not JSONB): the monitoring routers json.loads()
+    # final_settlement and return commitment_json verbatim to the UI, and
+    # the bundled SQLite predates jsonb().
+    if obj is None or isinstance(obj, str):
+        return obj
+    return json.dumps(obj, separators=(",", ":"))
+
+
 def _norm_settlement(s: Optional[dict]) -> dict:
     """Normalize incoming settlement JSON to the columns our INSERT expects."""
     s = dict(s or {})
     # quantity/unit_price → qty/price
     s["qty"] = s.get("qty") or s.get("quantity")
     s["price"] = s.get("price") or s.get("unit_price")
-    # buyer/seller from payer/vendor if not present
-    s["buyer"] = s.get("buyer") or s.get("payer")
-    s["seller"] = s.get("seller") or s.get("vendor")
+    # buyer/seller from payer/vendor if not present (lowercased once, as stored)
+    s["buyer"] = (s.get("buyer") or s.get("payer") or "").lower()
+    s["seller"] = (s.get("seller") or s.get("vendor") or "").lower()
     # default mode
     s["mode"] = s.get("mode") or "sim"
     # compute notional_ui if missing
@@ -162,72 +277,88 @@ def _norm_settlement(s: Optional[dict]) -> dict:
     return s
 
 
-def _insert_deal_initial(deal_id: str, normalized: dict, created_ts: int) -> None:
-    with _db_conn() as conn:
-        conn.execute(
-            """
-            INSERT INTO deals (
-                deal_id, status, mode, buyer, seller, sku, qty, unit_price,
-                vat_rate, notional_ui, commitment_json, created_ts, finalized_ts
-            ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
-            """,
-            (
-                deal_id,
-                normalized.get("status") or "draft",
-                normalized.get("mode") or "sim",
-                (normalized.get("buyer") or "").lower(),
-                (normalized.get("seller") or "").lower(),
-                normalized.get("sku") or "SKU-DEMO",
-                normalized.get("qty") or 0,
-                normalized.get("price") or 0,
-                normalized.get("vat_rate") or 0,
-                normalized.get("notional_ui"),
-                json.dumps(normalized, ensure_ascii=False) if normalized else None,
-                created_ts,
-                None,
-            ),
-        )
-        conn.commit()
-
-
-def _finalize_deal(deal_id: str, commitment: dict) -> None:
-    with _db_conn() as conn:
-        conn.execute(
-            """
-            UPDATE deals
-               SET status = ?, mode = ?, commitment_json = ?, finalized_ts = ?
-             WHERE deal_id = ?
-            """,
-            (
-                "settled",
-                "on_chain",
-                json.dumps(commitment, ensure_ascii=False),
-                int(time.time()),
-                deal_id,
-            ),
-        )
-        conn.commit()
-
-
-def _neg_log_add(payer: str, vendor: str, auditor: str, transcript: str, settlement: Optional[dict]) -> None:
-    with _db_conn() as conn:
-        conn.execute(
-            """
-            INSERT INTO negotiation_log (payer, vendor, auditor, transcript, final_settlement)
-            VALUES (?,?,?,?,?)
-            """,
-            (
-                payer,
-                vendor,
-                auditor,
-                transcript,
-                json.dumps(settlement, ensure_ascii=False) if settlement is not None else None,
-            ),
-        )
-        conn.commit()
+def _insert_deal_initial(
+    deal_id: str, normalized: dict, created_ts: int, conn: Optional[sqlite3.Connection] = None
+) -> None:
+    conn = conn or _db()
+    conn.execute(
+        """
+        INSERT INTO deals (
+            deal_id, status, mode, buyer, seller, sku, qty, unit_price,
+            vat_rate, notional_ui, commitment_json, created_ts, finalized_ts
+        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
+        """,
+        (
+            deal_id,
+            normalized.get("status") or "draft",
+            normalized.get("mode") or "sim",
+            normalized["buyer"],
+            normalized["seller"],
+            normalized.get("sku") or "SKU-DEMO",
+            normalized.get("qty") or 0,
+            normalized.get("price") or 0,
+            normalized.get("vat_rate") or 0,
+            normalized.get("notional_ui"),
+            _to_json(normalized) if normalized else None,
+            created_ts,
+            None,
+        ),
+    )
+
+
+def _finalize_deal(
+    deal_id: str, commitment: Union[dict, str], conn: Optional[sqlite3.Connection] = None
+) -> None:
+    conn = conn or _db()
+    conn.execute(
+        """
+        UPDATE deals
+           SET status = ?, mode = ?, commitment_json = ?, finalized_ts = ?
+         WHERE deal_id = ?
+        """,
+        (
+            "settled",
+            "on_chain",
+            _to_json(commitment),
+            _now(),
+            deal_id,
+        ),
+    )
+
+
+_NEG_LOG_TABLE = "neg.negotiation_log" if NEG_LOG_DB_PATH else "negotiation_log"
+_NEG_LOG_INSERT_SQL = f"""
+    INSERT INTO {_NEG_LOG_TABLE} (payer, vendor, auditor, transcript, final_settlement)
+    VALUES (?,?,?,?,?)
+"""
+
+
+def _neg_log_add_many(
+    rows: Iterable[Tuple[str, str, str, str, Union[dict, str, None]]],
+    conn: Optional[sqlite3.Connection] = None,
+) -> None:
+    """Insert (payer, vendor, auditor, transcript, settlement) rows in one executemany."""
+    conn = conn or _db()
+    conn.executemany(
+        _NEG_LOG_INSERT_SQL,
+        [
+            (payer, vendor, auditor, transcript, _to_json(settlement))
+            for payer, vendor, auditor, transcript, settlement in rows
+        ],
+    )
+
+
+# Module-level SQL text so every call hits the same sqlite3 statement-cache entry
+_INS_TX_SQL = """
+    INSERT INTO transactions
+    (txid, ts, block_number, from_address, to_address, amount_raw, amount_ui,
+     tier_from, tier_to, is_mint, eligible, notes, deal_id)
+    VALUES (:txid, :ts, :block_number, :from_address, :to_address, :amount_raw, :amount_ui,
+            :tier_from, :tier_to, :is_mint, :eligible, :notes, :deal_id)
+"""
 
 
-def _insert_tx_row_with_deal(
+def _tx_row(
     txid: str,
     ts: int,
     block: int,
@@ -241,32 +372,73 @@ def _insert_tx_row_with_deal(
     deal_id: str,
     tier_from: int = 1,
     tier_to: int = 1,
-) -> None:
-    with _db_conn() as conn:
-        conn.execute(
-            """
-            INSERT INTO transactions
-            (txid, ts, block_number, from_address, to_address, amount_raw, amount_ui,
-             tier_from, tier_to, is_mint, eligible, notes, deal_id)
-            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
-            """,
-            (
-                txid,
-                ts,
-                block,
-                from_addr.lower(),
-                to_addr.lower(),
-                int(amount_raw),
-                float(amount_ui),
-                int(tier_from),
-                int(tier_to),
-                int(is_mint),
-                int(eligible),
-                notes,
-                deal_id,
-            ),
-        )
-        conn.commit()
+) -> Dict[str, Any]:
+    """
+    Named-parameter row for ``_INS_TX_SQL``. Values are stored as given: callers
+    pass ints/floats and lowercase addresses, so no per-row coercion is done.
+    """
+    return {
+        "txid": txid,
+        "ts": ts,
+        "block_number": block,
+        "from_address": from_addr,
+        "to_address": to_addr,
+        "amount_raw": amount_raw,
+        "amount_ui": amount_ui,
+        "tier_from": tier_from,
+        "tier_to": tier_to,
+        "is_mint": is_mint,
+        "eligible": eligible,
+        "notes": notes,
+        "deal_id": deal_id,
+    }
+
+
+def _insert_tx_rows_with_deal(rows: Iterable[Dict[str, Any]], conn: Optional[sqlite3.Connection] = None) -> None:
+    """Insert rows built by ``_tx_row`` with one executemany."""
+    conn = conn or _db()
+    conn.executemany(_INS_TX_SQL, rows)
+
+
+# ---------- Calldata ----------
+
+# 4-byte selectors computed once; calldata is encoded directly instead of going
+# through ContractFunction ABI resolution on every transfer/mint.
+TRANSFER_SELECTOR = Web3.keccak(text="transfer(address,uint256)")[:4]
+MINT_SELECTOR = Web3.keccak(text="mint(address,uint256)")[:4]
+
+
+def _token_call_tx(selector: bytes, to: str, amount: int, fields: dict) -> dict:
+    """Build an (address, uint256) token call tx equivalent to build_transaction(fields)."""
+    tx = dict(fields)
+    tx["to"] = TOKEN_ADDR
+    tx["value"] = 0
+    tx["data"] = "0x" + (selector + abi_encode(["address", "uint256"], [to, amount])).hex()
+    return tx
+
+
+# ---------- Chain caches ----------
+
+_DECIMALS: Dict[str, int] = {}
+
+
+def _token_decimals(token) -> int:
+    """decimals() is immutable for a deployed token, so read it once per address."""
+    dec = _DECIMALS.get(token.address)
+    if dec is None:
+        try:
+            dec = int(token.functions.decimals().call())
+        except Exception:
+            return DEC_FALLBACK
+        _DECIMALS[token.address] = dec
+    return dec
+
+
+@functools.lru_cache(maxsize=64)
+def _block_ts(block_num: int) -> int:
+    """Block timestamps never change; legs mined in the same block share one lookup."""
+    blk = _chain()[0].eth.get_block(block_num)
+    return int(blk.get("timestamp") or _now())
 
 
 # ---------- LLM helper ----------
@@ -289,10 +461,11 @@ def run_negotiated_three_wallet_deal() -> Dict[str, Any]:
     executes on-chain settlement, writes transactions tied to the deal_id, and finalizes the deal.
     """
     deal_id = str(uuid.uuid4())
-    created_ts = int(time.time())
+    created_ts = _now()
 
-    buyer_addr = Account.from_key(A_PK).address
-    seller_addr = Account.from_key(B_PK).address
+    w3, token, deployer, A, B = _chain()
+    buyer_addr = A.address
+    seller_addr = B.address
 
     # Seed settlement proposal (can be replaced by LLM output later)
     proposed = {
@@ -305,18 +478,6 @@ def run_negotiated_three_wallet_deal() -> Dict[str, Any]:
         "vat_rate": 0.0,
     }
     normalized = _norm_settlement(proposed)
-    if normalized.get("notional_ui") is None:
-        try:
-            normalized["notional_ui"] = float(normalized.get("qty") or 0) * float(normalized.get("price") or 0)
-        except Exception:
-            normalized["notional_ui"] = None
-
-    # Initial DEAL row (status=draft)
-    _insert_deal_initial(deal_id, normalized, created_ts)
-
-    # Negotiation log (schema-aligned)
-    _neg_log_add(payer=buyer_addr, vendor=seller_addr, auditor="AuditorBot", transcript="Buyer proposes.", settlement=None)
-    _neg_log_add(payer=buyer_addr, vendor=seller_addr, auditor="AuditorBot", transcript="Seller accepts.", settlement=None)
 
     # A judge/arbiter recommends exact legs to execute
     commitment = {
@@ -327,148 +488,192 @@ def run_negotiated_three_wallet_deal() -> Dict[str, Any]:
             {"from": seller_addr, "to": C_ADDR, "ui": 100.0, "eligible": 0, "note": "B->C"},
         ],
     }
-    _neg_log_add(
-        payer=buyer_addr,
-        vendor=seller_addr,
-        auditor="AuditorBot",
-        transcript="Judge recommends settlement legs.",
-        settlement=commitment,
-    )
+    commitment_json = _to_json(commitment)  # shared by the log row and the deal update
 
     # ---------- On-chain settlement ----------
-    w3 = Web3(Web3.HTTPProvider(RPC_URL))
-    assert w3.is_connected(), "RPC not reachable"
-    token = w3.eth.contract(address=TOKEN_ADDR, abi=MIN_ABI)
+    # Rows are staged in memory while we wait on the chain and written in one
+    # short transaction afterwards, so no DB lock is held across RPC waits.
+    tx_rows: list = []
+
+    settled = False
     try:
-        dec = token.functions.decimals().call()
-    except Exception:
-        dec = DEC_FALLBACK
-    raw = lambda ui: int(ui * (10 ** dec))
-
-    deployer = Account.from_key(DEPLOYER_PK)
-    A = Account.from_key(A_PK)
-    B = Account.from_key(B_PK)
-
-    max_fee, tip = _fee_params(w3)
-    GAS_MINT = 200_000
-
-    # Mint 1000 to A
-    nonce_dep = w3.eth.get_transaction_count(deployer.address)
-    mint_raw = raw(1000.0)
-    tx_mint = token.functions.mint(A.address, mint_raw).build_transaction(
-        {
-            "from": deployer.address,
-            "nonce": nonce_dep,
-            "chainId": CHAIN_ID,
-            "type": 2,
-            "maxFeePerGas": max_fee,
-            "maxPriorityFeePerGas": tip,
-            "gas": GAS_MINT,
-        }
-    )
-    mint_txh, mint_rcpt = _send_signed(w3, tx_mint, DEPLOYER_PK)
-    blk = w3.eth.get_block(mint_rcpt.blockNumber)
-    ts = int(blk.get("timestamp", time.time()))
-    _insert_tx_row_with_deal(
-        txid=mint_txh,
-        ts=ts,
-        block=mint_rcpt.blockNumber,
-        from_addr="0x0000000000000000000000000000000000000000",
-        to_addr=A.address,
-        amount_raw=mint_raw,
-        amount_ui=1000.0,
-        is_mint=1,
-        eligible=0,
-        notes="mint",
-        deal_id=deal_id,
-        tier_from=0,
-        tier_to=1,
-    )
+        dec = _token_decimals(token)
+        raw = lambda ui: int(ui * (10 ** dec))
+
+        a_lc, b_lc, c_lc = A.address.lower(), B.address.lower(), C_ADDR.lower()
+
+        max_fee, tip = _fee_params(w3)
+        GAS_MINT = 200_000
+
+        # Build every leg up front: the deployer's three nonces are sequential,
+        # and A/B nonces do not depend on the deployer's transactions.
+        nonce_dep = w3.eth.get_transaction_count(deployer.address)
+        nonceA = w3.eth.get_transaction_count(A.address)
+        nonceB = w3.eth.get_transaction_count(B.address)
+
+        # Mint 1000 to A, then fund A & B native for gas
+        mint_raw = raw(1000.0)
+        tx_mint = _token_call_tx(
+            MINT_SELECTOR,
+            A.address,
+            mint_raw,
+            {
+                "from": deployer.address,
+                "nonce": nonce_dep,
+                "chainId": CHAIN_ID,
+                "type": 2,
+                "maxFeePerGas": max_fee,
+                "maxPriorityFeePerGas": tip,
+                "gas": GAS_MINT,
+            }
+        )
+        to_sign = [(tx_mint, DEPLOYER_PK)]
+        for i, target in enumerate([A.address, B.address], start=1):
+            tx = {
+                "to": target,
+                "value": 5 * 10**16,
+                "nonce": nonce_dep + i,
+                "chainId": CHAIN_ID,
+                "type": 2,
+                "maxFeePerGas": max_fee,
+                "maxPriorityFeePerGas": tip,
+                "gas": GAS_LIMIT_NATIVE_XFER,
+            }
+            to_sign.append((tx, DEPLOYER_PK))
+
+        # A -> B (100)
+        a2b_raw = raw(100.0)
+        tx1 = _token_call_tx(
+            TRANSFER_SELECTOR,
+            B.address,
+            a2b_raw,
+            {
+                "from": A.address,
+                "nonce": nonceA,
+                "chainId": CHAIN_ID,
+                "type": 2,
+                "maxFeePerGas": max_fee,
+                "maxPriorityFeePerGas": tip,
+                "gas": GAS_LIMIT_ERC20_TRANSFER,
+            }
+        )
+        to_sign.append((tx1, A.key))
+
+        # B -> C (100)
+        b2c_raw = raw(100.0)
+        tx2 = _token_call_tx(
+            TRANSFER_SELECTOR,
+            C_ADDR,
+            b2c_raw,
+            {
+                "from": B.address,
+                "nonce": nonceB,
+                "chainId": CHAIN_ID,
+                "type": 2,
+                "maxFeePerGas": max_fee,
+                "maxPriorityFeePerGas": tip,
+                "gas": GAS_LIMIT_ERC20_TRANSFER,
+            }
+        )
+        to_sign.append((tx2, B.key))
+
+        # ECDSA signing is CPU-bound native code; sign all five legs in parallel
+        # and only broadcast them in dependency order below.
+        with ThreadPoolExecutor(max_workers=len(to_sign)) as pool:
+            signed = list(pool.map(lambda job: _sign_raw(w3, *job), to_sign))
+            deployer_signed, a2b_signed, b2c_signed = signed[:3], signed[3], signed[4]
+
+        # Deployer: broadcast mint + both fundings, then one batched receipt wait
+        deployer_hashes = [w3.eth.send_raw_transaction(r) for r in deployer_signed]
+        deployer_rcpts = _wait_receipts(w3, deployer_hashes)
+
+        mint_txh, mint_rcpt = deployer_hashes[0].hex(), deployer_rcpts[0]
+        ts = _block_ts(mint_rcpt.blockNumber)
+        tx_rows.append(
+            _tx_row(
+                txid=mint_txh,
+                ts=ts,
+                block=mint_rcpt.blockNumber,
+                from_addr="0x0000000000000000000000000000000000000000",
+                to_addr=a_lc,
+                amount_raw=mint_raw,
+                amount_ui=1000.0,
+                is_mint=1,
+                eligible=0,
+                notes="mint",
+                deal_id=deal_id,
+                tier_from=0,
+                tier_to=1,
+            )
+        )
 
-    # Fund A & B native for gas
-    nonce_dep += 1
-    for target in [A.address, B.address]:
-        tx = {
-            "to": target,
-            "value": 5 * 10**16,
-            "nonce": nonce_dep,
-            "chainId": CHAIN_ID,
-            "type": 2,
-            "maxFeePerGas": max_fee,
-            "maxPriorityFeePerGas": tip,
-            "gas": GAS_LIMIT_NATIVE_XFER,
-        }
-        _send_signed(w3, tx, DEPLOYER_PK)
-        nonce_dep += 1
-
-    # A -> B (100)
-    nonceA = w3.eth.get_transaction_count(A.address)
-    a2b_raw = raw(100.0)
-    tx1 = token.functions.transfer(B.address, a2b_raw).build_transaction(
-        {
-            "from": A.address,
-            "nonce": nonceA,
-            "chainId": CHAIN_ID,
-            "type": 2,
-            "maxFeePerGas": max_fee,
-            "maxPriorityFeePerGas": tip,
-            "gas": GAS_LIMIT_ERC20_TRANSFER,
-        }
-    )
-    a2b_txh, a2b_rcpt = _send_signed(w3, tx1, A.key)
-    blk = w3.eth.get_block(a2b_rcpt.blockNumber)
-    ts = int(blk.get("timestamp", time.time()))
-    _insert_tx_row_with_deal(
-        txid=a2b_txh,
-        ts=ts,
-        block=a2b_rcpt.blockNumber,
-        from_addr=A.address,
-        to_addr=B.address,
-        amount_raw=a2b_raw,
-        amount_ui=100.0,
-        is_mint=0,
-        eligible=1,
-        notes="A->B",
-        deal_id=deal_id,
-        tier_from=1,
-        tier_to=1,
-    )
+        # A -> B needs A's mint and gas to have landed
+        a2b_hash = w3.eth.send_raw_transaction(a2b_signed)
+        a2b_txh, a2b_rcpt = a2b_hash.hex(), _wait_receipt(w3, a2b_hash)
+        ts = _block_ts(a2b_rcpt.blockNumber)
+        tx_rows.append(
+            _tx_row(
+                txid=a2b_txh,
+                ts=ts,
+                block=a2b_rcpt.blockNumber,
+                from_addr=a_lc,
+                to_addr=b_lc,
+                amount_raw=a2b_raw,
+                amount_ui=100.0,
+                is_mint=0,
+                eligible=1,
+                notes="A->B",
+                deal_id=deal_id,
+                tier_from=1,
+                tier_to=1,
+            )
+        )
 
-    # B -> C (100)
-    nonceB = w3.eth.get_transaction_count(B.address)
-    b2c_raw = raw(100.0)
-    tx2 = token.functions.transfer(C_ADDR, b2c_raw).build_transaction(
-        {
-            "from": B.address,
-            "nonce": nonceB,
-            "chainId": CHAIN_ID,
-            "type": 2,
-            "maxFeePerGas": max_fee,
-            "maxPriorityFeePerGas": tip,
-            "gas": GAS_LIMIT_ERC20_TRANSFER,
-        }
-    )
-    b2c_txh, b2c_rcpt = _send_signed(w3, tx2, B.key)
-    blk = w3.eth.get_block(b2c_rcpt.blockNumber)
-    ts = int(blk.get("timestamp", time.time()))
-    _insert_tx_row_with_deal(
-        txid=b2c_txh,
-        ts=ts,
-        block=b2c_rcpt.blockNumber,
-        from_addr=B.address,
-        to_addr=C_ADDR,
-        amount_raw=b2c_raw,
-        amount_ui=100.0,
-        is_mint=0,
-        eligible=0,
-        notes="B->C",
-        deal_id=deal_id,
-        tier_from=1,
-        tier_to=1,
-    )
+        # B -> C spends what B just received
+        b2c_hash = w3.eth.send_raw_transaction(b2c_signed)
+        b2c_txh, b2c_rcpt = b2c_hash.hex(), _wait_receipt(w3, b2c_hash)
+        ts = _block_ts(b2c_rcpt.blockNumber)
+        tx_rows.append(
+            _tx_row(
+                txid=b2c_txh,
+                ts=ts,
+                block=b2c_rcpt.blockNumber,
+                from_addr=b_lc,
+                to_addr=c_lc,
+                amount_raw=b2c_raw,
+                amount_ui=100.0,
+                is_mint=0,
+                eligible=0,
+                notes="B->C",
+                deal_id=deal_id,
+                tier_from=1,
+                tier_to=1,
+            )
+        )
 
-    # Finalize deal
-    _finalize_deal(deal_id, commitment)
+        settled = True
+    finally:
+        # ---------- Persist ----------
+        # Runs even when a leg fails: the draft deal, its negotiation and the
+        # legs that did land are recorded; only a full settlement finalizes it.
+        with _transaction(_db()) as conn:
+            # Initial DEAL row (status=draft)
+            _insert_deal_initial(deal_id, normalized, created_ts, conn=conn)
+
+            # Negotiation log (schema-aligned), one executemany for all turns
+            _neg_log_add_many(
+                [
+                    (buyer_addr, seller_addr, "AuditorBot", "Buyer proposes.", None),
+                    (buyer_addr, seller_addr, "AuditorBot", "Seller accepts.", None),
+                    (buyer_addr, seller_addr, "AuditorBot", "Judge recommends settlement legs.", commitment_json),
+                ],
+                conn=conn,
+            )
+
+            _insert_tx_rows_with_deal(tx_rows, conn=conn)
+
+            if settled:
+                _finalize_deal(deal_id, commitment_json, conn=conn)
 
     return {
         "deal_id": deal_id,
@@ -15,6 +15,7 @@ Provides TWO flows:
    - Seeds `agents` table for payer/vendor classification.
    - Returns a summary with tx hashes, final balances and UI rollups.
    - If *any* chain step fails, returns errors and **does not fabricate DB rows**.
+   - run_three_wallet_demo_async() runs it off the event loop for async routes.
 
 2) run_simple_agent()
    - Legacy env-driven loop (kept for compatibility). It does NOT write to DB.
@@ -27,19 +28,30 @@ DB schema:
 
 Defaults:
   - DB_PATH resolves to "data/app.db" unless overridden by env.
-  - Token decimals are read from chain, fallback to 6.
+  - Token decimals are read from chain once per (chain_id, token) and cached in
+    token_meta.json next to the DB; fallback to 6.
 """
 
 from __future__ import annotations
 
 import os
+import json
 import time
+import asyncio
 import sqlite3
-from typing import Dict, Any
+import threading
+import functools
+from decimal import Decimal
+from typing import Dict, Any, Optional
 
 from web3 import Web3
+from web3.datastructures import AttributeDict
+from eth_abi import encode as abi_encode
 from eth_account import Account
 
+from ..util.db import TX_INDEX_DDL, open_db
+from ..util.rpc import http_provider, rpc_batch
+
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -79,6 +91,9 @@ GAS_LIMIT_ERC20_TRANSFER = int(os.getenv("GAS_LIMIT_ERC20_TRANSFER", "120000"))
 GAS_LIMIT_NATIVE_XFER    = int(os.getenv("GAS_LIMIT_NATIVE_XFER", "21000"))
 GAS_LIMIT_MINT           = int(os.getenv("GAS_LIMIT_MINT", "200000"))
 
+# ---- Fee params are reused for this many seconds (~a couple of blocks) ----
+FEE_CACHE_TTL_S = float(os.getenv("FEE_CACHE_TTL_S", "5"))
+
 # ---- Token decimals fallback ----
 TOKEN_DECIMALS_DEFAULT = int(os.getenv("TOKEN_DECIMALS_DEFAULT", "6"))
 
@@ -121,17 +136,206 @@ MIN_ABI = [
 ]
 
 # ========= Helpers =========
+_FEE_CACHE: Dict[str, tuple[float, int, int]] = {}  # rpc url -> (fetched_at, max_fee, tip)
+
+def _remember_fees(w3: Web3, max_fee: int, tip: int) -> None:
+    _FEE_CACHE[w3.provider.endpoint_uri] = (time.monotonic(), max_fee, tip)
+
+def _forget_fees(w3: Web3) -> None:
+    """Drop cached fees, e.g. after the node rejects a tx as underpriced."""
+    _FEE_CACHE.pop(w3.provider.endpoint_uri, None)
+
 def _fee_params(w3: Web3) -> tuple[int, int]:
-    """Compute EIP-1559 fee parameters (maxFeePerGas, maxPriorityFeePerGas)."""
+    """
+    EIP-1559 fee parameters (maxFeePerGas, maxPriorityFeePerGas), reused for
+    FEE_CACHE_TTL_S so back-to-back runs skip the block + tip round trips.
+    """
+    cached = _FEE_CACHE.get(w3.provider.endpoint_uri)
+    if cached and time.monotonic() - cached[0] < FEE_CACHE_TTL_S:
+        return cached[1], cached[2]
     latest = w3.eth.get_block("latest")
     base = latest.get("baseFeePerGas") or w3.eth.gas_price
     try:
         tip = w3.eth.max_priority_fee
     except Exception:
         tip = max(1, w3.eth.gas_price // 10_000)
-    return int(base + tip * 2), int(tip)
+    max_fee, tip = int(base + tip * 2), int(tip)
+    _remember_fees(w3, max_fee, tip)
+    return max_fee, tip
 
-def _send_signed(w3: Web3, tx: dict, pk: str) -> tuple[str, dict]:
+# ---- Checksums and key->account derivations never change: compute each once ----
+@functools.lru_cache(maxsize=128)
+def _checksum(addr: str) -> str:
+    return Web3.to_checksum_address(addr)
+
+@functools.lru_cache(maxsize=32)
+def _account(pk: str):
+    return Account.from_key(pk)
+
+# ---- Precomputed selectors; calldata is encoded directly instead of via build_transaction ----
+_SEL_TRANSFER  = Web3.keccak(text="transfer(address,uint256)")[:4]
+_SEL_MINT      = Web3.keccak(text="mint(address,uint256)")[:4]
+_SEL_BALANCEOF = Web3.keccak(text="balanceOf(address)")[:4]
+_DECIMALS_CALLDATA = "0x313ce567"  # decimals()
+
+def _encode_transfer(to: str, value: int) -> str:
+    return "0x" + (_SEL_TRANSFER + abi_encode(["address", "uint256"], [to, value])).hex()
+
+def _encode_mint(to: str, value: int) -> str:
+    return "0x" + (_SEL_MINT + abi_encode(["address", "uint256"], [to, value])).hex()
+
+def _balance_of_calldata(addr: str) -> str:
+    return "0x" + (_SEL_BALANCEOF + abi_encode(["address"], [addr])).hex()
+
+def _to_raw(ui_amount, scale: int) -> int:
+    """UI amount -> integer base units, exact for decimal inputs (no float rounding)."""
+    return int(Decimal(str(ui_amount)) * scale)
+
+def _balance_of(w3: Web3, token_addr: str, addr: str) -> int:
+    return int.from_bytes(w3.eth.call({"to": token_addr, "data": _balance_of_calldata(addr)}), "big")
+
+# ---- one Web3 per RPC URL, riding the shared pooled session ----
+_W3_BY_URL: Dict[str, Web3] = {}
+
+def _get_w3(rpc_url: str = RPC_URL) -> Web3:
+    w3 = _W3_BY_URL.get(rpc_url)
+    if w3 is None:
+        w3 = _W3_BY_URL.setdefault(rpc_url, Web3(http_provider(rpc_url, timeout=60)))
+    return w3
+
+# ---- decimals() is immutable: memoize in-process and on disk across runs ----
+_DECIMALS_MEMO: Dict[str, int] = {}
+_TOKEN_META_LOCK = threading.Lock()
+
+def _token_meta_cache_path() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), "token_meta.json")
+
+def _token_meta_key(chain_id: int, token_addr: str) -> str:
+    return f"{chain_id}:{token_addr.lower()}"
+
+def _load_token_meta() -> Dict[str, Any]:
+    try:
+        with open(_token_meta_cache_path(), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def _cached_decimals(chain_id: int, token_addr: str) -> Optional[int]:
+    key = _token_meta_key(chain_id, token_addr)
+    if key not in _DECIMALS_MEMO:
+        dec = _load_token_meta().get(key, {}).get("decimals")
+        if dec is None:
+            return None
+        _DECIMALS_MEMO[key] = int(dec)
+    return _DECIMALS_MEMO[key]
+
+def _store_decimals(chain_id: int, token_addr: str, decimals: int) -> None:
+    """Remember ``decimals`` in memory and write it back atomically (tmp + replace)."""
+    key = _token_meta_key(chain_id, token_addr)
+    _DECIMALS_MEMO[key] = decimals
+    path = _token_meta_cache_path()
+    with _TOKEN_META_LOCK:
+        meta = _load_token_meta()
+        meta[key] = {"decimals": decimals}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(meta, fh)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # cache is best-effort; the in-process memo still applies
+
+def _get_decimals(token, chain_id: int) -> int:
+    """Token decimals from cache, else from chain (fallback TOKEN_DECIMALS_DEFAULT, not cached)."""
+    dec = _cached_decimals(chain_id, token.address)
+    if dec is None:
+        try:
+            dec = int(token.functions.decimals().call())
+        except Exception:
+            return TOKEN_DECIMALS_DEFAULT
+        _store_decimals(chain_id, token.address, dec)
+    return dec
+
+def _preflight(w3: Web3, token_addr: str, senders: list[str]) -> Dict[str, Any]:
+    """
+    Read fee params, sender nonces and (if not cached) decimals in one JSON-RPC
+    batch. Falls back to individual calls when the node rejects batch requests.
+    """
+    decimals = _cached_decimals(CHAIN_ID, token_addr)
+    calls = [
+        ("eth_getBlockByNumber", ["latest", False]),
+        ("eth_gasPrice", []),
+        ("eth_maxPriorityFeePerGas", []),
+    ] + [("eth_getTransactionCount", [addr, "pending"]) for addr in senders]
+    if decimals is None:
+        calls.append(("eth_call", [{"to": token_addr, "data": _DECIMALS_CALLDATA}, "latest"]))
+    try:
+        res = rpc_batch(w3.provider.endpoint_uri, calls)
+    except Exception:
+        res = None
+    n = len(senders)
+    if res is None or res[0] is None or res[1] is None or any(r is None for r in res[3:3 + n]):
+        if decimals is None:
+            decimals = _get_decimals(w3.eth.contract(address=token_addr, abi=MIN_ABI), CHAIN_ID)
+        max_fee, tip = _fee_params(w3)
+        nonces = {addr: w3.eth.get_transaction_count(addr, "pending") for addr in senders}
+        return {"decimals": decimals, "max_fee": max_fee, "tip": tip, "nonces": nonces}
+
+    block, gas_price, tip = res[0], int(res[1], 16), res[2]
+    base = int(block["baseFeePerGas"], 16) if block.get("baseFeePerGas") else gas_price
+    tip = int(tip, 16) if tip is not None else max(1, gas_price // 10_000)
+    nonces = {addr: int(nonce, 16) for addr, nonce in zip(senders, res[3:3 + n])}
+    if decimals is None:
+        dec_word = res[-1]
+        if dec_word and dec_word != "0x":
+            decimals = int(dec_word, 16)
+            _store_decimals(CHAIN_ID, token_addr, decimals)
+        else:
+            decimals = TOKEN_DECIMALS_DEFAULT
+    max_fee = int(base + tip * 2)
+    _remember_fees(w3, max_fee, tip)
+    return {"decimals": decimals, "max_fee": max_fee, "tip": tip, "nonces": nonces}
+
+def _balances(token, addrs: list[str]) -> list[int]:
+    """balanceOf for each address in one JSON-RPC batch (per-call fallback)."""
+    calls = [("eth_call", [{"to": token.address, "data": _balance_of_calldata(a)}, "latest"]) for a in addrs]
+    try:
+        res = rpc_batch(token.w3.provider.endpoint_uri, calls)
+    except Exception:
+        res = None
+    if res is None or any(r is None for r in res):
+        return [_balance_of(token.w3, token.address, a) for a in addrs]
+    return [int(r, 16) for r in res]
+
+# ---- Local nonce tracking: fetch once per sender, then hand out sequentially ----
+_NONCES: Dict[str, int] = {}
+_NONCE_LOCK = threading.Lock()
+
+def _next_nonce(w3: Web3, addr: str, chain_nonce: Optional[int] = None) -> int:
+    """
+    Next nonce for ``addr``. The first call seeds from ``chain_nonce`` (e.g. from
+    the pre-flight batch) or eth_getTransactionCount(pending); later calls just
+    increment, so concurrent runs in this process never reuse a nonce.
+    """
+    key = addr.lower()
+    with _NONCE_LOCK:
+        if key not in _NONCES:
+            _NONCES[key] = chain_nonce if chain_nonce is not None else w3.eth.get_transaction_count(addr, "pending")
+        elif chain_nonce is not None:
+            _NONCES[key] = max(_NONCES[key], chain_nonce)
+        nonce = _NONCES[key]
+        _NONCES[key] = nonce + 1
+    return nonce
+
+def _forget_nonces(*addrs: str) -> None:
+    """Drop local nonce state after a failed send so the next use resyncs from chain."""
+    with _NONCE_LOCK:
+        for addr in addrs:
+            _NONCES.pop(addr.lower(), None)
+
+def _sign_raw(w3: Web3, tx: dict, pk: str) -> bytes:
+    """Sign ``tx`` locally and return the raw bytes ready for send_raw_transaction."""
     signed = w3.eth.account.sign_transaction(tx, private_key=pk)
     # Web3 v5 uses .rawTransaction; Web3 v6+ can use .raw_transaction
     raw = getattr(signed, "rawTransaction", None)
@@ -139,37 +343,149 @@ def _send_signed(w3: Web3, tx: dict, pk: str) -> tuple[str, dict]:
         raw = getattr(signed, "raw_transaction", None)
     if raw is None:
         raise RuntimeError("SignedTransaction has no rawTransaction/raw_transaction attribute")
-    txh = w3.eth.send_raw_transaction(raw)
-    rcpt = w3.eth.wait_for_transaction_receipt(txh, timeout=240)
+    return raw
+
+def _check_receipt(rcpt, txh):
     if rcpt.status != 1:
         raise RuntimeError(f"Tx failed: {txh.hex()}")
+    return rcpt
+
+def _wait_receipt(w3: Web3, txh) -> dict:
+    """Block until ``txh`` is mined; raise if it reverted."""
+    return _check_receipt(w3.eth.wait_for_transaction_receipt(txh, timeout=240), txh)
+
+_RECEIPT_INT_FIELDS = ("status", "blockNumber", "gasUsed", "cumulativeGasUsed", "transactionIndex")
+
+def _as_receipt(raw) -> AttributeDict:
+    """Raw JSON-RPC receipt -> AttributeDict with the int fields callers read decoded."""
+    if isinstance(raw, AttributeDict):
+        return raw
+    rcpt = dict(raw)
+    for key in _RECEIPT_INT_FIELDS:
+        if isinstance(rcpt.get(key), str):
+            rcpt[key] = int(rcpt[key], 16)
+    return AttributeDict(rcpt)
+
+def _fetch_receipts(w3: Web3, hashes: list) -> list:
+    """eth_getTransactionReceipt for every hash in one batch; None where not yet mined."""
+    calls = [("eth_getTransactionReceipt", [Web3.to_hex(h)]) for h in hashes]
+    try:
+        res = rpc_batch(w3.provider.endpoint_uri, calls)
+    except Exception:
+        res = None
+    if res is not None:
+        return res
+    out = []
+    for h in hashes:
+        try:
+            out.append(w3.eth.get_transaction_receipt(h))
+        except Exception:
+            out.append(None)
+    return out
+
+def _wait_receipts(w3: Web3, hashes: list, timeout: float = 240, poll: float = 0.5) -> list:
+    """
+    Wait for several txs at once: one block filter, and per new block a single
+    batched receipt fetch for whatever is still pending (sleep-poll when the node
+    has no filter support). Returns receipts in ``hashes`` order; raises on revert.
+    """
+    receipts: list = [None] * len(hashes)
+    pending = list(range(len(hashes)))
+    try:
+        block_filter = w3.eth.filter("latest")
+    except Exception:
+        block_filter = None
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            fetched = _fetch_receipts(w3, [hashes[i] for i in pending])
+            still = []
+            for i, raw in zip(pending, fetched):
+                if raw is None:
+                    still.append(i)
+                else:
+                    receipts[i] = _check_receipt(_as_receipt(raw), hashes[i])
+            pending = still
+            if not pending:
+                return receipts
+            # Sleep until the next block (or just one poll interval without a filter)
+            while time.monotonic() < deadline:
+                time.sleep(poll)
+                if block_filter is None:
+                    break
+                try:
+                    if block_filter.get_new_entries():
+                        break
+                except Exception:
+                    block_filter = None
+                    break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Receipts not available after {timeout}s: {[Web3.to_hex(hashes[i]) for i in pending]}")
+    finally:
+        if block_filter is not None:
+            try:
+                w3.eth.uninstall_filter(block_filter.filter_id)
+            except Exception:
+                pass
+
+def _broadcast(w3: Web3, tx: dict, pk: str):
+    """Sign and send ``tx`` without waiting for it to be mined; returns the hash."""
+    return w3.eth.send_raw_transaction(_sign_raw(w3, tx, pk))
+
+def _send_signed(w3: Web3, tx: dict, pk: str) -> tuple[str, dict]:
+    txh = _broadcast(w3, tx, pk)
+    rcpt = _wait_receipt(w3, txh)
     return txh.hex(), rcpt
 
-def _seed_agents(payer_addr: str, vendor_addr: str, db_path: str) -> None:
-    """Insert payer and vendor entries into the agents table if they do not exist."""
-    payer_addr = payer_addr.lower()
-    vendor_addr = vendor_addr.lower()
-    with sqlite3.connect(db_path) as conn:
-        c = conn.cursor()
-        # Payer tier=1
-        c.execute(
-            """
-            INSERT OR IGNORE INTO agents (wallet, type, province, tier, meta_json)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (payer_addr, "payer", "", 1, "{}"),
-        )
-        # Vendor tier=1
-        c.execute(
-            """
-            INSERT OR IGNORE INTO agents (wallet, type, province, tier, meta_json)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (vendor_addr, "vendor", "", 1, "{}"),
-        )
-        conn.commit()
-
-def _insert_tx_row(
+# ---- SQLite: one WAL connection per thread, writes batched per run ----
+_LOCAL = threading.local()
+
+def _db(db_path: str = DB_PATH) -> sqlite3.Connection:
+    """Return this thread's connection to ``db_path``, opening it on first use."""
+    conns = getattr(_LOCAL, "conns", None)
+    if conns is None:
+        conns = _LOCAL.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        # Autocommit at the driver level; writers open explicit transactions.
+        conn = open_db(db_path, isolation_level=None, foreign_keys=True)
+        conns[db_path] = conn
+    return conn
+
+_SCHEMA_READY: set[str] = set()
+
+def _ensure_schema(db_path: str) -> None:
+    """Create the transactions indexes once per DB per process (no-op until the table exists)."""
+    if db_path in _SCHEMA_READY:
+        return
+    conn = _db(db_path)
+    try:
+        for ddl in TX_INDEX_DDL:
+            conn.execute(ddl)
+    except sqlite3.OperationalError:
+        return  # table not created yet (watcher owns it); retry next run
+    _SCHEMA_READY.add(db_path)
+
+_SEED_AGENT_SQL = """
+    INSERT OR IGNORE INTO agents (wallet, type, province, tier, meta_json)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_INSERT_TX_SQL = """
+    INSERT INTO transactions
+      (txid, ts, block_number, from_address, to_address,
+       amount_raw, amount_ui, tier_from, tier_to, is_mint, eligible, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def _agent_rows(payer_addr: str, vendor_addr: str) -> list[tuple]:
+    """Payer and vendor entries (tier=1) for _SEED_AGENT_SQL."""
+    return [
+        (payer_addr.lower(), "payer", "", 1, "{}"),
+        (vendor_addr.lower(), "vendor", "", 1, "{}"),
+    ]
+
+def _tx_row(
     txid: str,
     ts: int,
     block_number: int,
@@ -182,34 +498,43 @@ def _insert_tx_row(
     notes: str,
     tier_from: int = 1,
     tier_to: int = 1,
-    db_path: str = DB_PATH,
-) -> None:
-    """Insert a normalized transaction row into SQLite."""
-    with sqlite3.connect(db_path) as conn:
-        c = conn.cursor()
-        c.execute(
-            """
-            INSERT INTO transactions
-              (txid, ts, block_number, from_address, to_address,
-               amount_raw, amount_ui, tier_from, tier_to, is_mint, eligible, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                txid,
-                ts,
-                block_number,
-                from_addr.lower(),
-                to_addr.lower(),
-                int(amount_raw),
-                float(amount_ui),
-                int(tier_from),
-                int(tier_to),
-                int(is_mint),
-                int(eligible),
-                notes,
-            ),
-        )
-        conn.commit()
+) -> tuple:
+    """Normalize one transaction into the parameter tuple for _INSERT_TX_SQL."""
+    return (
+        txid,
+        ts,
+        block_number,
+        from_addr.lower(),
+        to_addr.lower(),
+        int(amount_raw),
+        float(amount_ui),
+        int(tier_from),
+        int(tier_to),
+        int(is_mint),
+        int(eligible),
+        notes,
+    )
+
+def flush_rows(rows: list[tuple], db_path: str = DB_PATH, agents: list[tuple] = ()) -> int:
+    """
+    Insert buffered transaction rows (and optional agent seeds, INSERT OR IGNORE)
+    with executemany inside one BEGIN IMMEDIATE transaction: one commit per
+    batch instead of one per row. Returns the number of transaction rows written.
+    """
+    if not rows and not agents:
+        return 0
+    conn = _db(db_path)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if agents:
+            conn.executemany(_SEED_AGENT_SQL, agents)
+        if rows:
+            conn.executemany(_INSERT_TX_SQL, rows)
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    return len(rows)
 
 # ========= DEMO: THREE-WALLET SEQUENCE (ON-CHAIN ONLY) =========
 def run_three_wallet_demo() -> Dict[str, Any]:
@@ -221,47 +546,49 @@ def run_three_wallet_demo() -> Dict[str, Any]:
       - Transfer 100 mUSD B -> C (eligible=0).
 
     Writes normalized rows into SQLite `transactions` for **real** receipts only.
-    On any failure, returns an error summary and does **not** fabricate rows.
+    Rows are collected as receipts arrive and written in one transaction at the
+    end. On any failure, returns an error summary and does **not** fabricate rows.
     """
     summary: Dict[str, Any] = {"steps": [], "errors": []}
+    tx_rows: list[tuple] = []
+    senders: list[str] = []
 
     # Resolve DB path and ensure parent folder exists
     abs_db = os.path.abspath(DB_PATH)
     os.makedirs(os.path.dirname(abs_db), exist_ok=True)
-
-    # Seed agents so UI can classify transfers
     try:
-        _seed_agents(A_ADDR, B_ADDR, abs_db)
+        _ensure_schema(abs_db)
     except Exception as exc:
-        summary["errors"].append(f"Seed agents failed (ignored): {exc}")
+        summary["errors"].append(f"Index setup failed (ignored): {exc}")
 
     try:
         # Web3 + contract
-        w3 = Web3(Web3.HTTPProvider(RPC_URL))
+        w3 = _get_w3()
         assert w3.is_connected(), "RPC not reachable"
 
-        token_addr = Web3.to_checksum_address(TOKEN_ADDR)
+        token_addr = _checksum(TOKEN_ADDR)
         token = w3.eth.contract(address=token_addr, abi=MIN_ABI)
 
-        # Decimals
-        try:
-            decimals = token.functions.decimals().call()
-        except Exception:
-            decimals = TOKEN_DECIMALS_DEFAULT
-
         # Accounts
-        deployer = Account.from_key(DEPLOYER_PK)
-        A = Account.from_key(A_PK)
-        B = Account.from_key(B_PK)
-        C_cs = Web3.to_checksum_address(C_ADDR)
-
-        max_fee, tip = _fee_params(w3)
+        deployer = _account(DEPLOYER_PK)
+        A = _account(A_PK)
+        B = _account(B_PK)
+        C_cs = _checksum(C_ADDR)
+
+        # Decimals, fees and all three sender nonces in one round trip
+        senders = [deployer.address, A.address, B.address]
+        pre = _preflight(w3, token_addr, senders)
+        decimals = pre["decimals"]
+        max_fee, tip = pre["max_fee"], pre["tip"]
+        scale = 10 ** decimals
 
         # (1) Mint to A
-        nonce_dep = w3.eth.get_transaction_count(deployer.address)
-        mint_raw = int(MINT_TO_A_UI * (10 ** decimals))
-        tx_mint = token.functions.mint(Web3.to_checksum_address(A.address), mint_raw).build_transaction({
+        nonce_dep = _next_nonce(w3, deployer.address, pre["nonces"][deployer.address])
+        mint_raw = _to_raw(MINT_TO_A_UI, scale)
+        tx_mint = {
             "from": deployer.address,
+            "to": token_addr,
+            "data": _encode_mint(A.address, mint_raw),
             "nonce": nonce_dep,
             "chainId": CHAIN_ID,
             "type": 2,
@@ -269,50 +596,59 @@ def run_three_wallet_demo() -> Dict[str, Any]:
             "maxPriorityFeePerGas": tip,
             "gas": GAS_LIMIT_MINT,
             "value": 0,
-        })
-        mint_txh, mint_rcpt = _send_signed(w3, tx_mint, DEPLOYER_PK)
+        }
+        mint_h = _broadcast(w3, tx_mint, DEPLOYER_PK)
+
+        # (2) Fund A & B with native ARC -- broadcast right behind the mint
+        fund_hashes = []
+        for target in [A.address, B.address]:
+            tx = {
+                "to": target,
+                "value": FUND_PER_SENDER_WEI,
+                "nonce": _next_nonce(w3, deployer.address),
+                "chainId": CHAIN_ID,
+                "type": 2,
+                "maxFeePerGas": max_fee,
+                "maxPriorityFeePerGas": tip,
+                "gas": GAS_LIMIT_NATIVE_XFER,
+            }
+            fund_hashes.append((target, _broadcast(w3, tx, DEPLOYER_PK)))
+
+        # One block filter + batched receipt fetch for all three deployer txs
+        mint_rcpt, _, _ = _wait_receipts(w3, [mint_h] + [h for _, h in fund_hashes])
+        mint_txh = mint_h.hex()
         summary["steps"].append({"mint_to_A_tx": mint_txh})
+        for target, fund_h in fund_hashes:
+            summary["steps"].append({"fund_native": {"target": target, "tx": fund_h.hex()}})
 
         blk = w3.eth.get_block(mint_rcpt.blockNumber)
         ts = int(blk.get("timestamp", time.time()))
-        _insert_tx_row(
+        tx_rows.append(_tx_row(
             txid=mint_txh,
             ts=ts,
             block_number=mint_rcpt.blockNumber,
             from_addr="0x0000000000000000000000000000000000000000",
             to_addr=A.address,
             amount_raw=mint_raw,
-            amount_ui=mint_raw / (10 ** decimals),
+            amount_ui=mint_raw / scale,
             is_mint=1,
             eligible=0,
             notes="mint",
             tier_from=0,
             tier_to=1,
-            db_path=abs_db,
-        )
+        ))
 
-        # (2) Fund A & B with native ARC
-        nonce_dep += 1
-        for target in [A.address, B.address]:
-            tx = {
-                "to": Web3.to_checksum_address(target),
-                "value": FUND_PER_SENDER_WEI,
-                "nonce": nonce_dep,
-                "chainId": CHAIN_ID,
-                "type": 2,
-                "maxFeePerGas": max_fee,
-                "maxPriorityFeePerGas": tip,
-                "gas": GAS_LIMIT_NATIVE_XFER,
-            }
-            fund_txh, _ = _send_signed(w3, tx, DEPLOYER_PK)
-            summary["steps"].append({"fund_native": {"target": target, "tx": fund_txh}})
-            nonce_dep += 1
+        # (3)+(4) stay separate transactions: A->B and B->C have different
+        # signers, so they cannot share one batchTransfer call, and B->C spends
+        # tokens that only exist once A->B has executed.
 
         # (3) A -> B (eligible)
-        transfer1_raw = int(TRANSFER_A_TO_B_UI * (10 ** decimals))
-        nonceA = w3.eth.get_transaction_count(A.address)
-        tx1 = token.functions.transfer(Web3.to_checksum_address(B.address), transfer1_raw).build_transaction({
+        transfer1_raw = _to_raw(TRANSFER_A_TO_B_UI, scale)
+        nonceA = _next_nonce(w3, A.address, pre["nonces"][A.address])
+        tx1 = {
             "from": A.address,
+            "to": token_addr,
+            "data": _encode_transfer(B.address, transfer1_raw),
             "nonce": nonceA,
             "chainId": CHAIN_ID,
             "type": 2,
@@ -320,33 +656,34 @@ def run_three_wallet_demo() -> Dict[str, Any]:
             "maxPriorityFeePerGas": tip,
             "gas": GAS_LIMIT_ERC20_TRANSFER,
             "value": 0,
-        })
+        }
         a2b_txh, a2b_rcpt = _send_signed(w3, tx1, A.key)  # bytes ok
         summary["steps"].append({"A_to_B_tx": a2b_txh})
 
         blk = w3.eth.get_block(a2b_rcpt.blockNumber)
         ts = int(blk.get("timestamp", time.time()))
-        _insert_tx_row(
+        tx_rows.append(_tx_row(
             txid=a2b_txh,
             ts=ts,
             block_number=a2b_rcpt.blockNumber,
             from_addr=A.address,
             to_addr=B.address,
             amount_raw=transfer1_raw,
-            amount_ui=transfer1_raw / (10 ** decimals),
+            amount_ui=transfer1_raw / scale,
             is_mint=0,
             eligible=1,  # vendor B
             notes="A->B",
             tier_from=1,
             tier_to=1,
-            db_path=abs_db,
-        )
+        ))
 
         # (4) B -> C (non-eligible)
-        transfer2_raw = int(TRANSFER_B_TO_C_UI * (10 ** decimals))
-        nonceB = w3.eth.get_transaction_count(B.address)
-        tx2 = token.functions.transfer(C_cs, transfer2_raw).build_transaction({
+        transfer2_raw = _to_raw(TRANSFER_B_TO_C_UI, scale)
+        nonceB = _next_nonce(w3, B.address, pre["nonces"][B.address])
+        tx2 = {
             "from": B.address,
+            "to": token_addr,
+            "data": _encode_transfer(C_cs, transfer2_raw),
             "nonce": nonceB,
             "chainId": CHAIN_ID,
             "type": 2,
@@ -354,36 +691,33 @@ def run_three_wallet_demo() -> Dict[str, Any]:
             "maxPriorityFeePerGas": tip,
             "gas": GAS_LIMIT_ERC20_TRANSFER,
             "value": 0,
-        })
+        }
         b2c_txh, b2c_rcpt = _send_signed(w3, tx2, B.key)
         summary["steps"].append({"B_to_C_tx": b2c_txh})
 
         blk = w3.eth.get_block(b2c_rcpt.blockNumber)
         ts = int(blk.get("timestamp", time.time()))
-        _insert_tx_row(
+        tx_rows.append(_tx_row(
             txid=b2c_txh,
             ts=ts,
             block_number=b2c_rcpt.blockNumber,
             from_addr=B.address,
             to_addr=C_cs,
             amount_raw=transfer2_raw,
-            amount_ui=transfer2_raw / (10 ** decimals),
+            amount_ui=transfer2_raw / scale,
             is_mint=0,
             eligible=0,  # C is not a registered vendor in this demo
             notes="B->C",
             tier_from=1,
             tier_to=1,
-            db_path=abs_db,
-        )
+        ))
 
         # Final balances
-        balA = token.functions.balanceOf(Web3.to_checksum_address(A.address)).call()
-        balB = token.functions.balanceOf(Web3.to_checksum_address(B.address)).call()
-        balC = token.functions.balanceOf(C_cs).call()
+        balA, balB, balC = _balances(token, [A.address, B.address, C_cs])
         summary["final_balances"] = {
-            "A": {"raw": balA, "ui": balA / (10 ** decimals)},
-            "B": {"raw": balB, "ui": balB / (10 ** decimals)},
-            "C": {"raw": balC, "ui": balC / (10 ** decimals)},
+            "A": {"raw": balA, "ui": balA / scale},
+            "B": {"raw": balB, "ui": balB / scale},
+            "C": {"raw": balC, "ui": balC / scale},
         }
         summary["decimals"] = decimals
         summary["token"] = TOKEN_ADDR
@@ -392,12 +726,27 @@ def run_three_wallet_demo() -> Dict[str, Any]:
         summary["tx_count"] = 2
         summary["transferred_ui"] = TRANSFER_A_TO_B_UI + TRANSFER_B_TO_C_UI
         summary["mode"] = "on_chain"
-        return summary
 
     except Exception as exc:
+        _forget_nonces(*senders)
+        if "underpriced" in str(exc).lower():
+            _forget_fees(_get_w3())
         summary["errors"].append(f"On-chain path failed: {exc}")
         summary["mode"] = "on_chain_failed"
-        return summary
+
+    # Seed agents (so UI can classify transfers) and persist the receipts we got
+    try:
+        flush_rows(tx_rows, abs_db, agents=_agent_rows(A_ADDR, B_ADDR))
+    except Exception as exc:
+        summary["errors"].append(f"DB write failed: {exc}")
+    return summary
+
+async def run_three_wallet_demo_async() -> Dict[str, Any]:
+    """
+    Await-able run_three_wallet_demo for async (FastAPI) callers: the receipt
+    waits happen on a worker thread so the event loop keeps serving requests.
+    """
+    return await asyncio.to_thread(run_three_wallet_demo)
 
 # ========= LEGACY ENV-DRIVEN AGENT (kept for compatibility; no DB) =========
 def run_simple_agent() -> Dict[str, Any]:
@@ -435,35 +784,33 @@ def run_simple_agent() -> Dict[str, Any]:
 
     # Connect to Web3
     try:
-        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        w3 = _get_w3(rpc_url)
         if not w3.is_connected():
             return {"error": "RPC not reachable"}
     except Exception as exc:
         return {"error": f"Web3 connection error: {exc}"}
 
-    token_addr = Web3.to_checksum_address(token_addr)
-    vendor_addr = Web3.to_checksum_address(vendor_addr)
+    token_addr = _checksum(token_addr)
+    vendor_addr = _checksum(vendor_addr)
 
     # Load payer account
     try:
-        payer_account = Account.from_key(payer_pk)
+        payer_account = _account(payer_pk)
     except Exception as exc:
         return {"error": f"Invalid private key: {exc}"}
 
     token = w3.eth.contract(address=token_addr, abi=MIN_ABI)
 
     # Determine decimals
-    try:
-        decimals = token.functions.decimals().call()
-    except Exception:
-        decimals = TOKEN_DECIMALS_DEFAULT
+    decimals = _get_decimals(token, chain_id)
 
     # Determine transfer amount (UI units)
     try:
         transfer_ui = float(os.getenv("AGENT_TRANSFER_UI", "100"))
     except ValueError:
         transfer_ui = 100.0
-    transfer_raw = int(transfer_ui * (10 ** decimals))
+    scale = 10 ** decimals
+    transfer_raw = _to_raw(transfer_ui, scale)
 
     # Determine number of transfers
     try:
@@ -477,38 +824,48 @@ def run_simple_agent() -> Dict[str, Any]:
         "errors": [],
     }
 
-    # Fees and nonce
+    # Fees
     try:
         max_fee, tip = _fee_params(w3)
-        nonce = w3.eth.get_transaction_count(payer_account.address)
+    except Exception as exc:
+        summary["errors"].append(f"Init failed: {exc}")
+        return summary
+
+    # One balance read up front, tracked locally; the loop stops on any failed tx,
+    # so the local figure never drifts from chain while it is in use
+    try:
+        bal_raw = _balance_of(w3, token_addr, payer_account.address)
     except Exception as exc:
         summary["errors"].append(f"Init failed: {exc}")
         return summary
 
     for _ in range(num_txs):
         try:
-            bal_raw = token.functions.balanceOf(payer_account.address).call()
             if bal_raw < transfer_raw:
                 break
-            tx = token.functions.transfer(vendor_addr, transfer_raw).build_transaction(
-                {
-                    "from": payer_account.address,
-                    "nonce": nonce,
-                    "chainId": chain_id,
-                    "type": 2,
-                    "maxFeePerGas": max_fee,
-                    "maxPriorityFeePerGas": tip,
-                }
-            )
-            tx["gas"] = int(w3.eth.estimate_gas(tx))
+            tx = {
+                "from": payer_account.address,
+                "to": token_addr,
+                "data": _encode_transfer(vendor_addr, transfer_raw),
+                "nonce": _next_nonce(w3, payer_account.address),
+                "chainId": chain_id,
+                "type": 2,
+                "maxFeePerGas": max_fee,
+                "maxPriorityFeePerGas": tip,
+                "gas": GAS_LIMIT_ERC20_TRANSFER,
+                "value": 0,
+            }
             txh, rcpt = _send_signed(w3, tx, payer_account.key.hex())
             if rcpt.get("status", 0) != 1:
                 summary["errors"].append(f"Tx {txh} failed")
                 break
             summary["tx_count"] += 1
             summary["transferred_ui"] += transfer_ui
-            nonce += 1
+            bal_raw -= transfer_raw
         except Exception as exc:
+            _forget_nonces(payer_account.address)
+            if "underpriced" in str(exc).lower():
+                _forget_fees(w3)
             summary["errors"].append(f"Error during transfer: {exc}")
             break
 
@@ -1,16 +1,11 @@
 import os
-from typing import Optional
+from typing import Any, Optional
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from backend.monitoring.deals_router import router as deals_router
 
 
-# Optional watcher (won't crash if missing)
-try:
-    from .watcher.watcher import Watcher  # type: ignore
-except Exception:
-    Watcher = None  # type: ignore
-
 # Optional simulation router
 try:
     from .simulation.router import router as simulation_router  # type: ignore
@@ -25,7 +20,12 @@ except Exception as e:
 
 DB_PATH = os.getenv("DB_PATH", "/data/app.db")
 
-app = FastAPI(title="ARC Hackathon Dashboard", docs_url="/docs", redoc_url="/redoc")
+app = FastAPI(
+    title="ARC Hackathon Dashboard",
+    docs_url="/docs",
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+)
 app.include_router(deals_router)
 
 # Optional sim endpoints
@@ -45,16 +45,26 @@ static_dir = "frontend_dist" if os.path.isdir("frontend_dist") else "frontend"
 print(f"[start] Serving static from: {static_dir}")
 app.mount("/", StaticFiles(directory=static_dir, html=True), name="frontend")
 
+def _load_watcher():
+    """Import the Watcher (and web3 with it) only when startup actually needs it."""
+    try:
+        from .watcher.watcher import Watcher  # type: ignore
+    except Exception:
+        return None
+    return Watcher
+
 @app.on_event("startup")
 async def start_watcher() -> None:
-    if not Watcher:
-        print("[start] Watcher not available; skipping.")
-        return
     rpc_url = os.getenv("RPC_URL")
     token_addr = os.getenv("TOKEN_ADDR")
     if not rpc_url or not token_addr:
         print("[start] Watcher not started: RPC_URL and TOKEN_ADDR must be set")
         return
+    # Optional watcher (won't crash if missing)
+    Watcher = _load_watcher()
+    if not Watcher:
+        print("[start] Watcher not available; skipping.")
+        return
     try:
         tau = float(os.getenv("VAT_RATE", "0.07"))
     except ValueError:
@@ -64,14 +74,25 @@ async def start_watcher() -> None:
     except ValueError:
         lam = 0.8
 
-    watcher = Watcher(db_path=DB_PATH, rpc_url=rpc_url, token_addr=token_addr, tau=tau, lam=lam)
+    # RPC_WS_URL switches the watcher from polling to an eth_subscribe feed
+    ws_url = os.getenv("RPC_WS_URL") or None
+    watcher = Watcher(db_path=DB_PATH, rpc_url=rpc_url, token_addr=token_addr, tau=tau, lam=lam, ws_url=ws_url)
     app.state.watcher = watcher
     watcher.start()
     print("Watcher started")
 
+@app.on_event("startup")
+async def warm_api_keys() -> None:
+    # Parse api_key.conf now so the first LLM call doesn't pay the disk read
+    try:
+        from .llm_handler import APIKeyManager
+        APIKeyManager.warm()
+    except Exception as e:
+        print(f"[start] API keys not preloaded: {e}")
+
 @app.on_event("shutdown")
 async def stop_watcher() -> None:
-    watcher: Optional["Watcher"] = getattr(app.state, "watcher", None)
+    watcher: Optional[Any] = getattr(app.state, "watcher", None)
     if watcher:
         watcher.stop()
         print("Watcher stopped")
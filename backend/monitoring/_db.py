@@ -0,0 +1,71 @@
+# backend/monitoring/_db.py
+"""
+Pooled SQLite connections for the monitoring routers.
+
+The dashboard polls these endpoints every few seconds. Re-opening the DB per
+request threw away SQLite's per-connection page cache and re-opened the
+.db/-wal/-shm files each time; a small LIFO pool keeps a few warm connections
+per DB path and hands one to each request.
+"""
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from ..util.db import open_db
+
+POOL_SIZE = 8
+
+
+class ConnectionPool:
+    """
+    LIFO pool of read-only connections to one DB; a connection is used by one
+    thread at a time. Schema changes go through their own short-lived connection.
+    """
+
+    def __init__(self, path: str, size: int = POOL_SIZE) -> None:
+        self.path = path
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+
+    def _open(self) -> sqlite3.Connection:
+        # Prepared statements are cached per connection; a pooled connection
+        # keeps them warm across requests instead of re-parsing on each open.
+        # The monitoring endpoints only read; refuse writes on pooled handles.
+        return open_db(self.path, check_same_thread=False, row_factory=sqlite3.Row, query_only=True)
+
+    def get(self) -> sqlite3.Connection:
+        """Check out a connection; pair with put() (or use acquire())."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+    def put(self, conn: sqlite3.Connection) -> None:
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def acquire(self) -> Iterator[sqlite3.Connection]:
+        conn = self.get()
+        try:
+            yield conn
+        finally:
+            self.put(conn)
+
+
+_POOLS: Dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(path: str) -> ConnectionPool:
+    """Return the process-wide pool for ``path``, creating it on first use."""
+    pool = _POOLS.get(path)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.setdefault(path, ConnectionPool(path))
+    return pool
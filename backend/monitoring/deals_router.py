@@ -1,19 +1,75 @@
 # backend/monitoring/deals_router.py
 import sqlite3
 from typing import List, Literal, Optional
-from fastapi import APIRouter, Query
+import orjson
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ._db import get_pool
 
 DB_PATH = "/data/app.db"
 router = APIRouter(prefix="/api", tags=["deals"])
 
-def _rows(sql: str, args=()):
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+# list_deals filters by status and pages by (created_ts, deal_id); these let it
+# walk an index range instead of scanning + sorting the table on every poll.
+_DEALS_INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS idx_deals_created_id ON deals(created_ts, deal_id)",
+    "CREATE INDEX IF NOT EXISTS idx_deals_status_created ON deals(status, created_ts, deal_id)",
+)
+_INDEXES_READY = False
+
+def _ensure_indexes() -> None:
+    global _INDEXES_READY
+    if _INDEXES_READY:
+        return
     try:
-        cur = conn.execute(sql, args)
-        return [dict(r) for r in cur.fetchall()]
+        # Pooled connections are query_only; DDL needs a writable handle.
+        conn = sqlite3.connect(DB_PATH, timeout=5)
+        try:
+            for ddl in _DEALS_INDEX_DDL:
+                conn.execute(ddl)
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return  # deals table not migrated yet (or DB busy); try again next call
+    _INDEXES_READY = True
+
+FETCH_CHUNK = 64
+
+def _stream_page(conn: sqlite3.Connection, cur: sqlite3.Cursor, limit: int, offset: int, layout: str):
+    """
+    Yield the list_deals JSON body chunk by chunk (fetchmany + orjson), so the
+    page is never held in memory as Rows and dicts and then as one big string.
+    The connection is handed back to the pool when the stream ends or aborts.
+
+    layout="items" emits one object per row. layout="columns" emits the column
+    names once and each row as an array: the cursor yields plain tuples, so a
+    whole chunk serializes in one orjson call with no per-row dict.
+    """
+    pool = get_pool(DB_PATH)
+    try:
+        if layout == "columns":
+            names = [d[0] for d in cur.description]
+            ts_i, id_i = names.index("created_ts"), names.index("deal_id")
+            yield b'{"columns":' + orjson.dumps(names) + b',"rows":['
+            encode = lambda chunk: orjson.dumps(chunk)[1:-1]
+        else:
+            ts_i, id_i = "created_ts", "deal_id"
+            yield b'{"items":['
+            encode = lambda chunk: b",".join(orjson.dumps(dict(r)) for r in chunk)
+        count = 0
+        last = None
+        for chunk in iter(lambda: cur.fetchmany(FETCH_CHUNK), []):
+            yield (b"," if count else b"") + encode(chunk)
+            count += len(chunk)
+            last = chunk[-1]
+        next_cursor = f"{last[ts_i]}:{last[id_i]}" if count == limit else None
+        tail = {"limit": limit, "offset": offset, "count": count, "next_cursor": next_cursor}
+        yield b"]," + orjson.dumps(tail)[1:]
     finally:
-        conn.close()
+        cur.close()
+        pool.put(conn)
 
 @router.get("/deals")
 def list_deals(
@@ -21,37 +77,50 @@ def list_deals(
     offset: int = Query(0, ge=0),
     status: Optional[str] = Query(None, description="Comma list, e.g. 'admitted,settled'"),
     order: Literal["asc","desc"] = "desc",
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (keyset paging)"),
+    layout: Literal["items","columns"] = Query("items", description="'columns' returns {columns, rows} arrays"),
 ):
+    _ensure_indexes()
     status_list = None
     params = []
     where = []
     if status:
         status_list = [s.strip() for s in status.split(",") if s.strip()]
         if status_list:
-            where.append("(" + " OR ".join(["status = ?"] * len(status_list)) + ")")
+            where.append("status IN (" + ",".join(["?"] * len(status_list)) + ")")
             params.extend(status_list)
+    if cursor:
+        # Keyset paging: continue after the last (created_ts, deal_id) seen
+        ts_str, _, last_id = cursor.partition(":")
+        try:
+            cursor_ts = int(ts_str)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        where.append("(created_ts, deal_id) " + ("<" if order == "desc" else ">") + " (?, ?)")
+        params.extend([cursor_ts, last_id])
+        offset = 0
 
     where_sql = ("WHERE " + " AND ".join(where)) if where else ""
     sql = f"""
       SELECT deal_id, status, mode, buyer, seller, sku, qty, unit_price, vat_rate,
-             notional_ui, commitment_json, created_ts, finalized_ts
+             notional_ui, commitment_json, created_ts, finalized_ts,
+             CASE WHEN created_ts THEN strftime('%Y-%m-%dT%H:%M:%SZ', created_ts, 'unixepoch') END AS created_iso
       FROM deals
       {where_sql}
-      ORDER BY created_ts {order}
+      ORDER BY created_ts {order}, deal_id {order}
       LIMIT ? OFFSET ?
     """
     params.extend([limit, offset])
-    rows = _rows(sql, params)
-
-    # Convert created_ts to ISO for the UI
-    for r in rows:
-        ts = r.get("created_ts")
-        if ts:
-            try:
-                import datetime as dt
-                r["created_iso"] = dt.datetime.utcfromtimestamp(int(ts)).isoformat() + "Z"
-            except Exception:
-                r["created_iso"] = None
-        else:
-            r["created_iso"] = None
-    return {"items": rows, "limit": limit, "offset": offset, "count": len(rows)}
+    # Run the query before streaming starts so SQL errors still surface as a 500
+    pool = get_pool(DB_PATH)
+    conn = pool.get()
+    cur = conn.cursor()
+    if layout == "columns":
+        cur.row_factory = None
+    try:
+        cur.execute(sql, params)
+    except BaseException:
+        cur.close()
+        pool.put(conn)
+        raise
+    return StreamingResponse(_stream_page(conn, cur, limit, offset, layout), media_type="application/json")
@@ -1,32 +1,67 @@
 # backend/monitoring/router.py
 from __future__ import annotations
-import os, sqlite3, json, time
-from typing import List, Dict, Any, Optional
-from fastapi import APIRouter
+import os, sqlite3, time, asyncio
+from typing import List, Dict, Any, Optional, Tuple
+import orjson
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from ._db import get_pool
 
 router = APIRouter()
 
 DB_PATH = os.getenv("DB_PATH", "/data/app.db")
 
 def _rows(q: str, params: tuple = ()) -> List[sqlite3.Row]:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    try:
-        cur = conn.execute(q, params)
-        return cur.fetchall()
-    finally:
-        conn.close()
+    with get_pool(DB_PATH).acquire() as conn:
+        return conn.execute(q, params).fetchall()
+
+def _tuples(q: str, params: tuple = ()) -> List[tuple]:
+    """Like _rows but plain tuples (no Row name lookups) for positional unpacking."""
+    with get_pool(DB_PATH).acquire() as conn:
+        cur = conn.cursor()
+        cur.row_factory = None
+        return cur.execute(q, params).fetchall()
+
+# Dashboard polls /metrics every few seconds; row counts needn't be exact per poll
+COUNT_TTL_S = 1.0
+_COUNT_CACHE: Dict[str, Tuple[float, int]] = {}
+
+# Fixed statement text so each pooled connection's statement cache hits every poll
+_SQL_COUNT = {
+    "transactions": "SELECT COUNT(*) c FROM transactions",
+    "negotiation_log": "SELECT COUNT(*) c FROM negotiation_log",
+}
+_SQL_LATEST_TX = """
+      SELECT txid, ts, block_number, from_address, to_address, amount_ui, is_mint, eligible
+      FROM transactions ORDER BY id DESC LIMIT 5
+    """
+_SQL_DEALS = """
+      SELECT id, created_at, payer, vendor, auditor, transcript, final_settlement
+      FROM negotiation_log
+      ORDER BY id DESC
+      LIMIT ?
+    """
+
+def _count(table: str, cached: bool = True) -> int:
+    hit = _COUNT_CACHE.get(table)
+    now = time.monotonic()
+    if cached and hit and now - hit[0] < COUNT_TTL_S:
+        return hit[1]
+    c = _rows(_SQL_COUNT[table])[0]["c"]
+    _COUNT_CACHE[table] = (now, c)
+    return c
 
 @router.get("/metrics")
 def metrics() -> Dict[str, Any]:
+    return _metrics_payload()
+
+def _metrics_payload(cached_counts: bool = True) -> Dict[str, Any]:
     # basic counts + latest balances (derived by summing transfers by address)
-    tx_count = _rows("SELECT COUNT(*) c FROM transactions")[0]["c"] if _rows("SELECT COUNT(*) c FROM transactions") else 0
-    deal_count = _rows("SELECT COUNT(*) c FROM negotiation_log")[0]["c"] if _rows("SELECT COUNT(*) c FROM negotiation_log") else 0
+    tx_count = _count("transactions", cached_counts)
+    deal_count = _count("negotiation_log", cached_counts)
 
-    latest = _rows("""
-      SELECT txid, ts, block_number, from_address, to_address, amount_ui, is_mint, eligible
-      FROM transactions ORDER BY id DESC LIMIT 5
-    """)
+    latest = _rows(_SQL_LATEST_TX)
     latest_list = [dict(r) for r in latest]
 
     return {
@@ -39,30 +74,58 @@ def metrics() -> Dict[str, Any]:
 
 @router.get("/deals")
 def deals(limit: int = 50) -> Dict[str, Any]:
-    logs = _rows("""
-      SELECT id, created_at, payer, vendor, auditor, transcript, final_settlement
-      FROM negotiation_log
-      ORDER BY id DESC
-      LIMIT ?
-    """, (limit,))
+    logs = _tuples(_SQL_DEALS, (limit,))
     out = []
-    for r in logs:
+    for id_, created_at, payer, vendor, auditor, transcript, settlement_raw in logs:
         try:
-            settlement = json.loads(r["final_settlement"] or "{}")
+            settlement = orjson.loads(settlement_raw) if settlement_raw else {}
         except Exception:
             settlement = {}
         out.append({
-            "id": r["id"],
-            "created_at": r["created_at"],
-            "payer": r["payer"],
-            "vendor": r["vendor"],
-            "auditor": r["auditor"],
+            "id": id_,
+            "created_at": created_at,
+            "payer": payer,
+            "vendor": vendor,
+            "auditor": auditor,
             "settlement": settlement,
-            "transcript": r["transcript"],
+            "transcript": transcript,
         })
     return {"ok": True, "deals": out}
 
+STREAM_POLL_S = 1.0
+STREAM_HEARTBEAT_S = 15.0
+
+def _data_version(conn: sqlite3.Connection) -> int:
+    # Bumps whenever another connection commits to the DB; costs no table reads
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+async def _metric_events(request: Request):
+    """SSE: push the /metrics payload only when the DB has actually changed."""
+    with get_pool(DB_PATH).acquire() as conn:
+        last_version = None
+        last_sent = time.monotonic()
+        while not await request.is_disconnected():
+            version = await asyncio.to_thread(_data_version, conn)
+            if version != last_version:
+                last_version = version
+                # Counts read fresh: a cached count from a poll just before
+                # the commit would be pushed stale until the next commit.
+                payload = await asyncio.to_thread(_metrics_payload, False)
+                yield b"data: " + orjson.dumps(payload) + b"\n\n"
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= STREAM_HEARTBEAT_S:
+                yield b": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(STREAM_POLL_S)
+
 @router.get("/stream")
-def stream_placeholder() -> Dict[str, Any]:
-    # simple placeholder so the frontend stops erroring
-    return {"ok": True, "note": "SSE not implemented; polling /metrics and /deals instead."}
\ No newline at end of file
+def stream(request: Request):
+    # Clients asking for text/event-stream get live pushes; plain fetch() keeps
+    # the JSON placeholder the frontend polls today.
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _metric_events(request),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
+    return {"ok": True, "note": "SSE available with Accept: text/event-stream; otherwise poll /metrics and /deals."}
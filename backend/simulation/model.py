@@ -21,21 +21,62 @@ introduced, extend the helper functions here.
 from __future__ import annotations
 
 import math
-from typing import List, Dict, Any
-
-def _compute_k_i(lam: float, L_i: float) -> float:
-    """Compute the provincial multiplier k_i given marginal propensity to spend
-    ``lam`` and leakage ``L_i``. This uses the geometric series formula
-    1 / (1 - lam * (1 - L_i)). Raises ValueError if the term in the
-    denominator is non‑positive, which would indicate an infinite or
-    negative multiplier.
-    """
-    denom = 1.0 - lam * (1.0 - L_i)
-    if denom <= 0:
-        raise ValueError("Invalid parameters: lam * (1 - L_i) must be < 1")
-    return 1.0 / denom
+from typing import Annotated, Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+# ---------------------------------------------------------------------------
+# Payload schema
+# ---------------------------------------------------------------------------
+# Validated once per request by pydantic-core; the helpers below then read
+# typed attributes instead of chains of ``payload.get(...)`` with defaults.
+# Unknown keys are tolerated, as they were with the plain dict payload.
+
+Vec3 = Annotated[List[float], Field(min_length=3, max_length=3)]
+
+class VentureParams(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    alpha0: float = 0.0
+    alpha1: float = 0.0
+    alpha2: float = 0.0
+    participants_active: Union[float, List[float]] = 0.0
+
+class NKParams(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    x: float = 0.02
+    kappa: float = 0.1
+
+class MarkovParams(BaseModel):
+    # Left untyped: shapes are checked in _compute_markov, which skips (rather
+    # than rejects) a malformed chain, as it did with the plain dict payload.
+    model_config = ConfigDict(extra="allow")
+
+    use: Any = False
+    pi: Any = None
+    ell: Any = None
+    s0: Any = None
 
-def _compute_closed_form(payload: Dict[str, Any]) -> Dict[str, Any]:
+class SimulationPayload(BaseModel):
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+    L: Vec3 = Field(default_factory=lambda: [0.0, 0.0, 0.0])
+    omega: Vec3 = Field(default_factory=lambda: [1/3, 1/3, 1/3])
+    lam: float = Field(0.8, alias="lambda")
+    tau: float = 0.0
+    G: float = 0.0
+    venture: VentureParams = Field(default_factory=VentureParams)
+    nk: NKParams = Field(default_factory=NKParams)
+    markov: MarkovParams = Field(default_factory=MarkovParams)
+
+    @field_validator("venture", "nk", "markov", mode="before")
+    @classmethod
+    def _null_section_is_default(cls, value: Any) -> Any:
+        # An explicit null section means "use the defaults", like an absent one
+        return {} if value is None else value
+
+def _compute_closed_form(payload: SimulationPayload) -> Dict[str, Any]:
     """
     Compute closed‑form results: multipliers, money creation and VAT.
 
@@ -50,35 +91,41 @@ def _compute_closed_form(payload: Dict[str, Any]) -> Dict[str, Any]:
     returns per‑province multipliers ``k_i``, aggregate multiplier ``k``,
     money creation ``deltaM`` and VAT revenue ``vat``.
     """
-    L = payload.get("L", [0.0, 0.0, 0.0])
-    omega = payload.get("omega", [1/3, 1/3, 1/3])
-    lam = payload.get("lambda", 0.8)
-    tau = payload.get("tau", 0.0)
-    G = payload.get("G", 0.0)
-
-    if len(L) != 3 or len(omega) != 3:
-        raise ValueError("L and omega must each have length 3")
+    L = payload.L
+    omega = payload.omega
+    lam = payload.lam
+    tau = payload.tau
+    G = payload.G
 
     # Normalize omega in case it does not sum exactly to 1 due to user input
     total_omega = sum(omega)
     if total_omega != 0:
         omega = [w / total_omega for w in omega]
 
-    k_i: List[float] = []
-    M_i: List[float] = []
-    T_i: List[float] = []
-    for i in range(3):
-        k_val = _compute_k_i(lam, L[i])
-        k_i.append(k_val)
-        G_i = omega[i] * G
-        M_val = k_val * G_i
-        M_i.append(M_val)
-        # VAT from province i: tau * G_i * (1 - L_i) / (1 - lam * (1 - L_i))
-        vat_i = tau * G_i * ((1.0 - L[i]) / (1.0 - lam * (1.0 - L[i]))) if tau > 0 else 0.0
-        T_i.append(vat_i)
+    # The model is fixed at three tiers, so the per-tier work is written out
+    # straight-line: no loop, list growth or zip per request.
+    L0, L1, L2 = L
+    w0, w1, w2 = omega
+    # Provincial multiplier k_i = 1 / (1 - lam * (1 - L_i)) (geometric
+    # series); a non-positive denominator means an infinite or negative
+    # multiplier.  All three are checked with one branch.
+    d0 = 1.0 - lam * (1.0 - L0)
+    d1 = 1.0 - lam * (1.0 - L1)
+    d2 = 1.0 - lam * (1.0 - L2)
+    if min(d0, d1, d2) <= 0:
+        raise ValueError("Invalid parameters: lam * (1 - L_i) must be < 1")
+    k0, k1, k2 = 1.0 / d0, 1.0 / d1, 1.0 / d2
+    G0, G1, G2 = w0 * G, w1 * G, w2 * G
+    k_i: List[float] = [k0, k1, k2]
+    M_i: List[float] = [k0 * G0, k1 * G1, k2 * G2]
+    # VAT from province i: tau * G_i * (1 - L_i) / (1 - lam * (1 - L_i)) = tau * G_i * (1 - L_i) * k_i
+    if tau > 0:
+        T_i: List[float] = [tau * G0 * (1.0 - L0) * k0, tau * G1 * (1.0 - L1) * k1, tau * G2 * (1.0 - L2) * k2]
+    else:
+        T_i = [0.0, 0.0, 0.0]
 
     # Aggregate multiplier as weighted average of k_i
-    k = sum(omega[i] * k_i[i] for i in range(3))
+    k = w0 * k0 + w1 * k1 + w2 * k2
     deltaM = k * G
     total_vat = sum(T_i)
 
@@ -90,7 +137,7 @@ def _compute_closed_form(payload: Dict[str, Any]) -> Dict[str, Any]:
         "vat": total_vat,
     }
 
-def _compute_venture(payload: Dict[str, Any], closed_form: Dict[str, Any]) -> Dict[str, Any]:
+def _compute_venture(payload: SimulationPayload, closed_form: Dict[str, Any]) -> Dict[str, Any]:
     """
     Compute venture formation metrics.  Liquidity density D_i is defined
     as M_i / P_i where M_i comes from closed form.  P_i defaults to
@@ -110,12 +157,11 @@ def _compute_venture(payload: Dict[str, Any], closed_form: Dict[str, Any]) -> Di
     Returns a dict with lists ``D_i``, ``Pv_i``, ``V_i`` and scalar
     ``V`` (total ventures).
     """
-    venture_params = payload.get("venture", {})
-    alpha0 = venture_params.get("alpha0", 0.0)
-    alpha1 = venture_params.get("alpha1", 0.0)
-    alpha2 = venture_params.get("alpha2", 0.0)
+    venture_params = payload.venture
+    alpha0 = venture_params.alpha0
+    alpha1 = venture_params.alpha1
 
-    participants = venture_params.get("participants_active", 0.0)
+    participants = venture_params.participants_active
     # Accept either a single number or list per tier
     if isinstance(participants, list):
         if len(participants) != 3:
@@ -126,22 +172,10 @@ def _compute_venture(payload: Dict[str, Any], closed_form: Dict[str, Any]) -> Di
         P_i = [participants / 3.0] * 3 if participants else [0.0, 0.0, 0.0]
 
     M_i = closed_form.get("M_i", [0.0, 0.0, 0.0])
-    D_i: List[float] = []
-    Pv_i: List[float] = []
-    V_i: List[float] = []
-
-    for i in range(3):
-        if P_i[i] > 0:
-            D_val = M_i[i] / P_i[i]
-        else:
-            D_val = 0.0
-        D_i.append(D_val)
-        # For now, omit sigma^2 term; could be extended later
-        pv = alpha0 + alpha1 * D_val + alpha2 * 0.0
-        # Clip probability between 0 and 1 for safety
-        pv = max(0.0, min(1.0, pv))
-        Pv_i.append(pv)
-        V_i.append(pv * P_i[i])
+    D_i: List[float] = [M / P if P > 0 else 0.0 for M, P in zip(M_i, P_i)]
+    # For now, omit sigma^2 term (alpha2 * 0); clip probability between 0 and 1 for safety
+    Pv_i: List[float] = [max(0.0, min(1.0, alpha0 + alpha1 * D)) for D in D_i]
+    V_i: List[float] = [pv * P for pv, P in zip(Pv_i, P_i)]
 
     total_V = sum(V_i)
 
@@ -152,7 +186,7 @@ def _compute_venture(payload: Dict[str, Any], closed_form: Dict[str, Any]) -> Di
         "V": total_V,
     }
 
-def _compute_nk(payload: Dict[str, Any]) -> Dict[str, Any]:
+def _compute_nk(payload: SimulationPayload) -> Dict[str, Any]:
     """
     Compute a rough New Keynesian price impact band.  The NK model
     suggests inflation responds to the output gap via the Phillips curve.
@@ -162,9 +196,8 @@ def _compute_nk(payload: Dict[str, Any]) -> Dict[str, Any]:
     The ``nk`` sub-dictionary may contain ``x`` (output gap) and
     ``kappa`` (slope).  Defaults: x=0.02, kappa=0.1.
     """
-    nk_params = payload.get("nk", {})
-    x = nk_params.get("x", 0.02)
-    kappa = nk_params.get("kappa", 0.1)
+    x = payload.nk.x
+    kappa = payload.nk.kappa
     dPi_low = kappa * x
     dPi_high = 1.5 * kappa * x
     return {
@@ -172,32 +205,34 @@ def _compute_nk(payload: Dict[str, Any]) -> Dict[str, Any]:
         "dPi_high": dPi_high,
     }
 
-def _invert_3x3(matrix: List[List[float]]) -> List[List[float]]:
+def _det_3x3(a: float, b: float, c: float,
+             d: float, e: float, f: float,
+             g: float, h: float, i: float) -> float:
+    return a*(e*i - f*h) - b*(d*i - f*g) + c*(d*h - e*g)
+
+def _solve_3x3(matrix: List[List[float]], rhs: List[float]) -> List[float]:
     """
-    Invert a 3×3 matrix.  Uses the adjugate/determinant formula.  Raises
-    ValueError if the matrix is singular (determinant zero).  This
-    function does not attempt any numerical stabilisation; since our
-    matrices are small and hand‑constructed, this is sufficient.
+    Solve ``matrix @ x = rhs`` for a 3×3 system by Cramer's rule, without
+    forming the inverse.  Raises ValueError if the matrix is singular
+    (determinant zero).  As with the hand‑constructed matrices used here, no
+    pivoting/stabilisation is attempted.
     """
-    # Unpack for readability
-    a,b,c = matrix[0]
-    d,e,f = matrix[1]
-    g,h,i = matrix[2]
-    det = (
-        a*(e*i - f*h) - b*(d*i - f*g) + c*(d*h - e*g)
-    )
+    (a, b, c), (d, e, f), (g, h, i) = matrix
+    r0, r1, r2 = rhs
+    det = _det_3x3(a, b, c, d, e, f, g, h, i)
     if abs(det) < 1e-12:
-        raise ValueError("Matrix is singular and cannot be inverted")
+        raise ValueError("Matrix is singular")
     inv_det = 1.0 / det
-    # Compute cofactors and transpose (adjugate)
-    inv = [
-        [ (e*i - f*h) * inv_det, -(b*i - c*h) * inv_det,  (b*f - c*e) * inv_det ],
-        [-(d*i - f*g) * inv_det,  (a*i - c*g) * inv_det, -(a*f - c*d) * inv_det ],
-        [ (d*h - e*g) * inv_det, -(a*h - b*g) * inv_det,  (a*e - b*d) * inv_det ],
+    return [
+        _det_3x3(r0, b, c, r1, e, f, r2, h, i) * inv_det,
+        _det_3x3(a, r0, c, d, r1, f, g, r2, i) * inv_det,
+        _det_3x3(a, b, r0, d, e, r1, g, h, r2) * inv_det,
     ]
-    return inv
 
-def _compute_markov(payload: Dict[str, Any]) -> Dict[str, Any]:
+# Rounding slack when checking tau + ell_j <= 1
+_MARKOV_EPS = 1e-12
+
+def _compute_markov(payload: SimulationPayload) -> Dict[str, Any]:
     """
     Compute Markov absorption shares and effective multiplier if requested.
 
@@ -211,17 +246,17 @@ def _compute_markov(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     The function returns ``aVAT`` (absorption into VAT), ``aLEAK`` and
     ``k_eff`` (Markov effective multiplier).  If markov.use is False or
-    required parameters are missing, returns an empty dict.
+    required parameters are missing, returns an empty dict.  Raises
+    ``ValueError`` if tau + ell_j > 1 for some tier.
     """
-    markov = payload.get("markov", {})
-    if not markov or not markov.get("use"):
+    markov = payload.markov
+    if not markov.use:
         return {}
-    # Extract parameters with fallbacks
-    pi = markov.get("pi")
-    ell = markov.get("ell")
-    s0 = markov.get("s0")
-    tau = payload.get("tau", 0.0)
-    lam = payload.get("lambda", 0.8)
+    pi = markov.pi
+    ell = markov.ell
+    s0 = markov.s0
+    tau = payload.tau
+    lam = payload.lam
     if pi is None or ell is None or s0 is None:
         return {}
     if len(pi) != 3 or any(len(row) != 3 for row in pi):
@@ -232,36 +267,32 @@ def _compute_markov(payload: Dict[str, Any]) -> Dict[str, Any]:
     total_s0 = sum(s0)
     if total_s0 != 0:
         s0 = [x / total_s0 for x in s0]
-    # Build Q (3×3) and R (3×2) matrices
-    Q = [[0.0]*3 for _ in range(3)]
-    R = [[0.0]*2 for _ in range(3)]
-    for j in range(3):
-        leak_j = ell[j]
-        for k in range(3):
-            Q[j][k] = (1.0 - tau - leak_j) * pi[j][k]
-        R[j][0] = tau
-        R[j][1] = leak_j
-    # Compute fundamental matrix N = (I - Q)^-1
-    I_minus_Q = [[0.0]*3 for _ in range(3)]
-    for r in range(3):
-        for c in range(3):
-            I_minus_Q[r][c] = (1.0 if r == c else 0.0) - Q[r][c]
-    try:
-        N = _invert_3x3(I_minus_Q)
-    except ValueError:
-        return {}
-    # Compute visits v^T = s0^T N (length 3), absorptions a^T = v^T R (length 2)
-    # v = s0 @ N
-    v = [0.0, 0.0, 0.0]
-    for j in range(3):
-        for k in range(3):
-            v[k] += s0[j] * N[j][k]
-    # a = v @ R
-    aVAT = 0.0
-    aLEAK = 0.0
-    for j in range(3):
-        aVAT += v[j] * R[j][0]
-        aLEAK += v[j] * R[j][1]
+    # Q[j][k] = (1 - tau - ell_j) * pi[j][k]; R[j] = (tau, ell_j).  Visits
+    # v^T = s0^T N with N = (I - Q)^-1, i.e. solve (I - Q)^T v = s0 directly
+    # rather than forming N.  Unrolled for the fixed three tiers.  Each row of
+    # [Q | R] must sum to 1, so tau + ell_j > 1 is rejected (a negative
+    # continuation share); tau + ell_j == 1 up to rounding is a share of 0.
+    q0, q1, q2 = (1.0 - tau - e for e in ell)
+    if min(q0, q1, q2) < -_MARKOV_EPS:
+        raise ValueError("Invalid parameters: tau + ell_j must be <= 1")
+    q0, q1, q2 = max(0.0, q0), max(0.0, q1), max(0.0, q2)
+    if not (q0 or q1 or q2):
+        # Q = 0, so N = I and every unit is absorbed on its first visit.
+        v = s0
+    else:
+        (p00, p01, p02), (p10, p11, p12), (p20, p21, p22) = pi
+        I_minus_Q_T = [
+            [1.0 - q0 * p00, -q1 * p10, -q2 * p20],
+            [-q0 * p01, 1.0 - q1 * p11, -q2 * p21],
+            [-q0 * p02, -q1 * p12, 1.0 - q2 * p22],
+        ]
+        try:
+            v = _solve_3x3(I_minus_Q_T, s0)
+        except ValueError:
+            return {}
+    # Absorptions a^T = v^T R (length 2)
+    aVAT = v[0] * tau + v[1] * tau + v[2] * tau
+    aLEAK = v[0] * ell[0] + v[1] * ell[1] + v[2] * ell[2]
     # Effective multiplier per monetary unit: k_eff = 1 + lam * (sum of visits)
     visits_sum = sum(v)
     k_eff = 1.0 + lam * visits_sum
@@ -271,11 +302,13 @@ def _compute_markov(payload: Dict[str, Any]) -> Dict[str, Any]:
         "k_eff": k_eff,
     }
 
-def run_simulation(payload: Dict[str, Any]) -> Dict[str, Any]:
+def run_simulation(payload: Union[SimulationPayload, Dict[str, Any]]) -> Dict[str, Any]:
     """
     Main entrypoint to compute all simulation metrics.  Accepts a
-    ``payload`` dictionary with keys described in the helper functions.
-    Missing keys will be replaced with sensible defaults.  Returns a
+    ``SimulationPayload`` (or a plain dictionary, validated into one) with
+    keys described in the helper functions.  Missing keys will be replaced
+    with sensible defaults; malformed ones raise ``pydantic.ValidationError``
+    (a ``ValueError``).  Returns a
     dictionary with the following structure:
 
     ```json
@@ -294,6 +327,8 @@ def run_simulation(payload: Dict[str, Any]) -> Dict[str, Any]:
     choose to include it separately.  Exceptions raised by helper
     functions will propagate out to the caller.
     """
+    if not isinstance(payload, SimulationPayload):
+        payload = SimulationPayload.model_validate(payload)
     # Closed form results
     closed_form = _compute_closed_form(payload)
     # Venture formation results
@@ -5,7 +5,12 @@ parameters and return computed results based on the economic model.  This
 placeholder illustrates how to define a router; replace the example
 implementation with real logic as you develop the simulation submodule.
 """
-from fastapi import APIRouter, HTTPException
+import hashlib
+import threading
+from collections import OrderedDict
+
+import orjson
+from fastapi import APIRouter, HTTPException, Request, Response
 
 # Import the simulation model entrypoint.  This provides the core
 # economic calculations described in the policy proposal.
@@ -13,8 +18,59 @@ from .model import run_simulation as model_run_simulation
 
 router = APIRouter()
 
+# run_simulation is pure, so identical payloads (UI re-runs, preset compares)
+# are served from an LRU of already-serialized responses.
+RESULT_CACHE_SIZE = 512
+_RESULT_CACHE: "OrderedDict[bytes, bytes]" = OrderedDict()
+_RESULT_CACHE_LOCK = threading.Lock()
+
+def _payload_key(payload: dict) -> bytes:
+    return hashlib.blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+
+# Scenarios outlined in the economic policy paper. Static, so the response
+# body and its ETag are built once at import.
+PRESETS = [
+    {
+        "name": "Baseline (open)",
+        "params": {
+            "L": [0.7, 0.7, 0.7],
+            "omega": [1/3, 1/3, 1/3],
+            "lambda": 0.8,
+            "tau": 0.07,
+            "G": 300_000_000_000,
+        },
+    },
+    {
+        "name": "Thai‑Boosty (tiered)",
+        "params": {
+            "L": [0.0, 0.5, 0.7],
+            "omega": [0.3, 0.5, 0.2],
+            "lambda": 0.8,
+            "tau": 0.07,
+            "G": 300_000_000_000,
+        },
+    },
+    {
+        "name": "Optimized regional",
+        "params": {
+            "L": [0.3, 0.3, 0.3],
+            "omega": [0.4, 0.4, 0.2],
+            "lambda": 0.8,
+            "tau": 0.07,
+            "G": 300_000_000_000,
+        },
+    },
+]
+_PRESETS_BYTES = orjson.dumps({"presets": PRESETS})
+_PRESETS_ETAG = '"' + hashlib.md5(_PRESETS_BYTES).hexdigest() + '"'
+# "Compare presets" posts each preset's params verbatim, so their results are
+# computed once here and never leave the cache.
+_PRESET_RESULTS = {
+    _payload_key(p["params"]): orjson.dumps(model_run_simulation(p["params"])) for p in PRESETS
+}
+
 @router.get("/presets")
-async def get_presets() -> dict:
+async def get_presets(request: Request) -> Response:
     """
     Return a list of preset parameter sets for the simulation tab.  These
     presets correspond to scenarios outlined in the economic policy paper.
@@ -22,43 +78,15 @@ async def get_presets() -> dict:
     is a list of objects with ``name`` and ``params`` keys.  Each ``params``
     object contains the leakage vector ``L``, spending weights ``omega``,
     marginal propensity ``lambda``, VAT rate ``tau`` and transfer ``G``.
+    Clients sending a matching ``If-None-Match`` get an empty 304.
     """
-    presets = [
-        {
-            "name": "Baseline (open)",
-            "params": {
-                "L": [0.7, 0.7, 0.7],
-                "omega": [1/3, 1/3, 1/3],
-                "lambda": 0.8,
-                "tau": 0.07,
-                "G": 300_000_000_000,
-            },
-        },
-        {
-            "name": "Thai‑Boosty (tiered)",
-            "params": {
-                "L": [0.0, 0.5, 0.7],
-                "omega": [0.3, 0.5, 0.2],
-                "lambda": 0.8,
-                "tau": 0.07,
-                "G": 300_000_000_000,
-            },
-        },
-        {
-            "name": "Optimized regional",
-            "params": {
-                "L": [0.3, 0.3, 0.3],
-                "omega": [0.4, 0.4, 0.2],
-                "lambda": 0.8,
-                "tau": 0.07,
-                "G": 300_000_000_000,
-            },
-        },
-    ]
-    return {"presets": presets}
+    headers = {"ETag": _PRESETS_ETAG}
+    if request.headers.get("if-none-match") == _PRESETS_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(content=_PRESETS_BYTES, media_type="application/json", headers=headers)
 
 @router.post("/run")
-async def run_simulation(payload: dict) -> dict:
+async def run_simulation(payload: dict) -> Response:
     """
     Compute the simulation based on supplied parameters.  The request
     body should contain keys defined in the simulation model.  On
@@ -67,8 +95,28 @@ async def run_simulation(payload: dict) -> dict:
     during computation (e.g., invalid parameters), a 400 response is
     generated with the error message.
     """
+    try:
+        key = _payload_key(payload)
+    except TypeError:
+        key = None  # not canonically serializable; just compute
+    if key is not None:
+        body = _PRESET_RESULTS.get(key)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+        with _RESULT_CACHE_LOCK:
+            body = _RESULT_CACHE.get(key)
+            if body is not None:
+                _RESULT_CACHE.move_to_end(key)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
     try:
         results = model_run_simulation(payload)
     except Exception as exc:
         raise HTTPException(status_code=400, detail=str(exc))
-    return results
+    body = orjson.dumps(results)
+    if key is not None:
+        with _RESULT_CACHE_LOCK:
+            _RESULT_CACHE[key] = body
+            if len(_RESULT_CACHE) > RESULT_CACHE_SIZE:
+                _RESULT_CACHE.popitem(last=False)
+    return Response(content=body, media_type="application/json")
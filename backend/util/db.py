@@ -0,0 +1,67 @@
+# backend/util/db.py
+"""
+Shared SQLite setup for the backend.
+
+The watcher, the agent runners and the monitoring API all open the same DB
+file; opening it through ``open_db`` keeps their pragmas in step, and
+``TX_INDEX_DDL`` is the one definition of the transactions indexes any of
+them may create.
+"""
+from __future__ import annotations
+
+import sqlite3
+from typing import Any
+
+STATEMENT_CACHE = 256
+CACHE_SIZE_KIB = 65536
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Lookup indexes for the monitoring reads and the smes_active recount. txid is
+# not unique: one tx can emit several Transfer logs, and the watcher and an
+# agent runner can both record the same transfer. The eligible index is NOCASE
+# to match the recount's GROUP BY; the BINARY one it replaces went unused.
+TX_INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS idx_tx_block ON transactions(block_number)",
+    "CREATE INDEX IF NOT EXISTS idx_tx_to_addr ON transactions(to_address)",
+    "CREATE INDEX IF NOT EXISTS idx_tx_from_addr ON transactions(from_address)",
+    "CREATE INDEX IF NOT EXISTS idx_tx_txid ON transactions(txid)",
+    "DROP INDEX IF EXISTS idx_tx_eligible",
+    "CREATE INDEX IF NOT EXISTS idx_tx_eligible_nocase ON transactions(to_address COLLATE NOCASE) WHERE eligible=1",
+)
+
+
+def open_db(
+    path: str,
+    *,
+    row_factory: Any = None,
+    foreign_keys: bool = False,
+    query_only: bool = False,
+    **opts: Any,
+) -> sqlite3.Connection:
+    """
+    Open ``path`` with the pragmas every user of the shared DB wants: WAL so
+    the API keeps reading while the watcher writes, NORMAL sync (fsync at
+    checkpoints, not every commit), a busy timeout instead of an immediate
+    "database is locked", and an in-memory temp store, large page cache and
+    mmap'd reads. ``opts`` go to ``sqlite3.connect`` (``isolation_level``,
+    ``check_same_thread``, ...).
+    """
+    opts.setdefault("timeout", 5.0)
+    opts.setdefault("cached_statements", STATEMENT_CACHE)
+    conn = sqlite3.connect(path, **opts)
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.OperationalError:
+        pass  # DB busy/locked right now; WAL is persistent once any writer sets it
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    if foreign_keys:
+        conn.execute("PRAGMA foreign_keys=ON")
+    if query_only:
+        conn.execute("PRAGMA query_only=1")
+    return conn
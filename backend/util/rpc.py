@@ -0,0 +1,60 @@
+# backend/util/rpc.py
+"""
+Shared JSON-RPC transport for the backend.
+
+Every Web3 handle built here rides on one pooled ``requests.Session`` so the
+many small calls a flow makes (nonces, fees, send_raw_transaction, receipt
+polling) reuse a kept-alive TCP/TLS connection instead of handshaking anew.
+"""
+from __future__ import annotations
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from web3 import Web3
+
+RPC_TIMEOUT = 30
+
+
+def pooled_session(pool_connections: int = 8, pool_maxsize: int = 16) -> requests.Session:
+    """Session with keep-alive pooling and a short retry on connection errors."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=3, backoff_factor=0.2),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+SESSION = pooled_session()
+
+
+def http_provider(rpc_url: str, timeout: int = RPC_TIMEOUT) -> Web3.HTTPProvider:
+    """HTTPProvider bound to the shared pooled session."""
+    return Web3.HTTPProvider(rpc_url, request_kwargs={"timeout": timeout}, session=SESSION)
+
+
+def rpc_batch(rpc_url: str, calls: Sequence[Tuple[str, list]], timeout: int = RPC_TIMEOUT) -> Optional[List[Any]]:
+    """
+    Send ``calls`` as ``(method, params)`` pairs in one JSON-RPC batch POST.
+
+    Returns the raw results in call order, with ``None`` for any entry the node
+    answered with an error. Returns ``None`` overall if the node does not answer
+    with a batch array, so callers can fall back to one request per call.
+    """
+    payload = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+    resp = SESSION.post(rpc_url, json=payload, timeout=timeout)
+    resp.raise_for_status()
+    body = resp.json()
+    if not isinstance(body, list):
+        return None
+    by_id = {item.get("id"): item for item in body if isinstance(item, dict)}
+    return [by_id.get(i, {}).get("result") for i in range(len(calls))]
@@ -6,7 +6,8 @@ USDC‑like transfer events on a specified token contract and writes
 normalized transaction records into a SQLite database.  It also maintains
 rolling metrics such as observed money creation, leakage, VAT estimates
 and active SMEs.  The watcher runs in a background thread and polls
-periodically for new logs.
+periodically for new logs, or, when given a websocket URL, catches up over
+HTTP and then records logs as the node pushes them (eth_subscribe).
 
 Note: Network calls may block; this implementation uses a separate
 thread to avoid blocking the FastAPI event loop.  The environment must
@@ -14,15 +15,79 @@ provide RPC_URL, CHAIN_ID, and TOKEN_ADDR via environment variables.
 """
 from __future__ import annotations
 
+import asyncio
 import os
 import threading
-import time
 import sqlite3
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Set
 
+from hexbytes import HexBytes
 from web3 import Web3
 
+from ..util.db import TX_INDEX_DDL, open_db
+from ..util.rpc import http_provider, rpc_batch
+
+
+STATEMENT_CACHE = 64
+# keccak256("Transfer(address,address,uint256)"), the ERC-20 Transfer event topic
+TRANSFER_TOPIC = bytes.fromhex("ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef")
+TRANSFER_TOPIC_HEX = "0x" + TRANSFER_TOPIC.hex()
+# Token amounts are scaled by decimals(); USDC-style 6 if the token won't say
+DEFAULT_DECIMALS = 6
+_DECIMALS_CALLDATA = "0x313ce567"  # decimals()
+# eth_getLogs cost grows sharply with the block span; catch-up is done in windows
+MAX_BLOCK_RANGE = int(os.getenv("MAX_BLOCK_RANGE", "500"))
+# Idle polls back off exponentially from poll_interval up to this cap
+MAX_IDLE_POLL_S = 60.0
+# Pushed logs arriving within this gap (one block's burst) are written together
+SUBSCRIPTION_COALESCE_S = 0.05
+# Block timestamps never change, so they are kept across polls (LRU-bounded)
+BLOCK_TS_CACHE_SIZE = 4096
+
+
+def _open_db(path: str) -> sqlite3.Connection:
+    """Open ``path`` with the shared pragmas (see backend.util.db.open_db)."""
+    return open_db(path, cached_statements=STATEMENT_CACHE)
+
+
+_INSERT_TX_SQL = """
+    INSERT INTO transactions (txid, ts, block_number, from_address, to_address, amount_raw, amount_ui, tier_from, tier_to, is_mint, eligible, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# An SME is active once it has made SME_SALES_THRESHOLD eligible sales
+SME_SALES_THRESHOLD = 3
+# Applied once per window with the window's accumulated increments; smes_active
+# is recounted over all recorded sales in the same statement.
+_UPDATE_METRICS_SQL = """
+    UPDATE metrics SET
+        m1_obs=m1_obs+?, leakage=leakage+?, vat_est=vat_est+?,
+        smes_active=(
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM transactions WHERE eligible=1
+                GROUP BY to_address COLLATE NOCASE HAVING COUNT(*) >= ?
+            )
+        ),
+        last_block=?
+    WHERE id=1
+"""
+_SELECT_METRICS_SQL = "SELECT m1_obs, leakage, vat_est, smes_active, last_block FROM metrics WHERE id=1"
+_SELECT_AGENTS_SQL = "SELECT wallet, type, province, tier, meta_json FROM agents WHERE wallet COLLATE NOCASE IN "
+# Bound parameters per agents lookup (under SQLite's default variable limit)
+AGENT_LOOKUP_CHUNK = 500
+
+
+def _normalize_log(log) -> dict:
+    """Pushed logs may carry hex strings where get_logs returns HexBytes and ints."""
+    block = log["blockNumber"]
+    return {
+        "transactionHash": HexBytes(log["transactionHash"]),
+        "blockNumber": int(block, 16) if isinstance(block, str) else block,
+        "topics": [HexBytes(t) for t in log["topics"]],
+        "data": HexBytes(log["data"]),
+    }
+
 
 class Watcher:
     def __init__(
@@ -33,6 +98,8 @@ class Watcher:
         tau: float = 0.07,
         lam: float = 0.8,
         poll_interval: float = 5.0,
+        max_block_range: int = MAX_BLOCK_RANGE,
+        ws_url: Optional[str] = None,
     ) -> None:
         self.db_path = db_path
         self.rpc_url = rpc_url
@@ -40,11 +107,26 @@ class Watcher:
         self.tau = tau
         self.lam = lam
         self.poll_interval = poll_interval
+        self.max_block_range = max(1, max_block_range)
+        # Polls in a row that found no new block; stretches the sleep between polls
+        self._idle_polls = 0
+        # Websocket endpoint for push mode; None keeps the polling loop
+        self.ws_url = ws_url
         self.w3: Optional[Web3] = None
         self._stop = threading.Event()
         self._thread: Optional[threading.Thread] = None
-        # topic for ERC20 Transfer event
-        self.transfer_topic = Web3.keccak(text="Transfer(address,address,uint256)").hex()
+        # Long-lived connection owned by the watcher thread; its statement
+        # cache keeps the per-poll INSERT/UPDATE/SELECTs compiled.
+        self._conn: Optional[sqlite3.Connection] = None
+        self._block_ts: "OrderedDict[int, int]" = OrderedDict()
+        # Agents looked up so far (None = no such agent), valid for one data_version
+        self._agents: Dict[str, Optional[Dict[str, any]]] = {}
+        self._agents_version: Optional[int] = None
+        # Raw -> UI divisor, resolved from the token once the RPC is connected
+        self.decimals = DEFAULT_DECIMALS
+        self._amount_divisor = float(10 ** DEFAULT_DECIMALS)
+        # topic for ERC20 Transfer event (filter form)
+        self.transfer_topic = TRANSFER_TOPIC_HEX
         # Keep track of last processed block to avoid duplicates
         self.last_block_key = "last_block"
 
@@ -66,27 +148,66 @@ class Watcher:
         """Main loop: connect to Web3, ensure DB, then poll for logs."""
         # Connect to Web3 provider
         try:
-            self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
+            # Shared keep-alive session: the poll loop's calls reuse one connection
+            self.w3 = Web3(http_provider(self.rpc_url))
             if not self.w3.is_connected():
                 print("Watcher: RPC not reachable")
                 return
         except Exception as exc:
             print(f"Watcher: Web3 connection error: {exc}")
             return
-        # Ensure DB schema
-        self._init_db()
-        # Poll loop
-        while not self._stop.is_set():
-            try:
-                self._poll()
-            except Exception as exc:
-                # Log and continue
-                print(f"Watcher: error during poll: {exc}")
-            time.sleep(self.poll_interval)
+        self._load_decimals()
+        try:
+            # Ensure DB schema
+            self._init_db()
+            # Poll loop (or subscription, which returns when the socket drops
+            # and is retried after one interval)
+            while not self._stop.is_set():
+                try:
+                    if self.ws_url:
+                        asyncio.run(self._follow_subscription())
+                    elif self._poll():
+                        self._idle_polls = 0
+                    else:
+                        self._idle_polls += 1
+                except Exception as exc:
+                    # Log and continue
+                    print(f"Watcher: error during poll: {exc}")
+                self._stop.wait(self._poll_delay())
+        finally:
+            # Closed here rather than in stop(): the connection belongs to this thread
+            self._close_db()
+
+    def _poll_delay(self) -> float:
+        """poll_interval, doubled per consecutive idle poll (capped at MAX_IDLE_POLL_S)."""
+        if not self._idle_polls:
+            return self.poll_interval
+        return min(self.poll_interval * (2 ** min(self._idle_polls, 16)), max(MAX_IDLE_POLL_S, self.poll_interval))
+
+    def _load_decimals(self) -> None:
+        """Read the token's decimals() once; keep the default if the call fails."""
+        try:
+            raw = self.w3.eth.call({"to": self.token_addr, "data": _DECIMALS_CALLDATA})
+            self.decimals = int.from_bytes(raw, "big") if raw else DEFAULT_DECIMALS
+        except Exception as exc:
+            print(f"Watcher: decimals() unavailable, assuming {DEFAULT_DECIMALS}: {exc}")
+            self.decimals = DEFAULT_DECIMALS
+        self._amount_divisor = float(10 ** self.decimals)
+
+    def _db(self) -> sqlite3.Connection:
+        """Return the watcher's connection, opening it on first use."""
+        if self._conn is None:
+            self._conn = _open_db(self.db_path)
+        return self._conn
+
+    def _close_db(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
 
     def _init_db(self) -> None:
         """Initialize the SQLite database with required tables if they don't exist."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._db() as conn:
             c = conn.cursor()
             # Transactions table
             c.execute(
@@ -121,6 +242,10 @@ class Watcher:
                 )
                 """
             )
+            # Indexes for the dashboard lookups and the smes_active recount.
+            # txid is not unique: one tx can emit several Transfer logs.
+            for ddl in TX_INDEX_DDL:
+                c.execute(ddl)
             # Initialise metrics row if absent
             c.execute("SELECT COUNT(*) FROM metrics WHERE id=1")
             if c.fetchone()[0] == 0:
@@ -136,7 +261,7 @@ class Watcher:
                 """
                 CREATE TABLE IF NOT EXISTS agents (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    wallet TEXT UNIQUE NOT NULL,
+                    wallet TEXT UNIQUE NOT NULL COLLATE NOCASE,
                     type TEXT,
                     province TEXT,
                     tier INTEGER,
@@ -144,179 +269,214 @@ class Watcher:
                 )
                 """
             )
+            # Case-insensitive wallet lookups on DBs created before the column was NOCASE
+            c.execute("CREATE INDEX IF NOT EXISTS idx_agents_wallet_nocase ON agents(wallet COLLATE NOCASE)")
             conn.commit()
 
     def _get_metrics(self) -> Dict[str, float]:
         """Load current metrics from the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute("SELECT m1_obs, leakage, vat_est, smes_active, last_block FROM metrics WHERE id=1")
-            row = c.fetchone()
-            return {
-                "m1_obs": row[0],
-                "leakage": row[1],
-                "vat_est": row[2],
-                "smes_active": row[3],
-                "last_block": row[4],
-            }
+        row = self._db().execute(_SELECT_METRICS_SQL).fetchone()
+        return {
+            "m1_obs": row[0],
+            "leakage": row[1],
+            "vat_est": row[2],
+            "smes_active": row[3],
+            "last_block": row[4],
+        }
 
-    def _update_metrics(self, m1_inc=0.0, leak_inc=0.0, vat_inc=0.0, smes_active=None, last_block=None) -> None:
-        """Incrementally update metrics and optionally set smes_active and last_block."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute(
-                "SELECT m1_obs, leakage, vat_est, smes_active, last_block FROM metrics WHERE id=1"
-            )
-            row = c.fetchone()
-            m1 = row[0] + m1_inc
-            leak = row[1] + leak_inc
-            vat = row[2] + vat_inc
-            smes = smes_active if smes_active is not None else row[3]
-            block = last_block if last_block is not None else row[4]
-            c.execute(
-                "UPDATE metrics SET m1_obs=?, leakage=?, vat_est=?, smes_active=?, last_block=? WHERE id=1",
-                (m1, leak, vat, smes, block),
-            )
-            conn.commit()
+    def _fetch_block_timestamps(self, block_nums: List[int]) -> Dict[int, int]:
+        """Block headers for ``block_nums`` in one batched RPC; per-call fallback."""
+        calls = [("eth_getBlockByNumber", [hex(num), False]) for num in block_nums]
+        try:
+            res = rpc_batch(self.rpc_url, calls)
+        except Exception:
+            res = None
+        if res is not None:
+            return {num: int(blk["timestamp"], 16) for num, blk in zip(block_nums, res) if blk}
+        return {num: self.w3.eth.get_block(num)["timestamp"] for num in block_nums}
+
+    def _block_timestamps(self, block_nums) -> Dict[int, int]:
+        """Timestamps for ``block_nums``; only blocks not already cached hit the node."""
+        cache = self._block_ts
+        missing = [num for num in block_nums if num not in cache]
+        if missing:
+            fetched = self._fetch_block_timestamps(missing)
+            for num in missing:
+                # A header the batch could not return is fetched on its own
+                ts = fetched.get(num)
+                cache[num] = ts if ts is not None else self.w3.eth.get_block(num)["timestamp"]
+        out: Dict[int, int] = {}
+        for num in block_nums:
+            cache.move_to_end(num)
+            out[num] = cache[num]
+        while len(cache) > BLOCK_TS_CACHE_SIZE:
+            cache.popitem(last=False)
+        return out
 
-    def _poll(self) -> None:
-        """Fetch new Transfer logs since the last processed block and insert into DB."""
+    def _poll(self) -> bool:
+        """
+        Fetch new Transfer logs since the last processed block and insert into DB.
+        Returns False when there was no new block to process.
+        """
         if not self.w3:
-            return
+            return False
         metrics = self._get_metrics()
         last_block = metrics.get("last_block", 0)
         latest_block = self.w3.eth.block_number
         if latest_block <= last_block:
-            return
-        # Build filter
+            return False
+        # Walk the range in bounded windows; each window commits its rows and
+        # last_block, so a crash or timeout only repeats the current window.
+        start = last_block + 1
+        while start <= latest_block and not self._stop.is_set():
+            end = min(start + self.max_block_range - 1, latest_block)
+            self._process_range(start, end)
+            start = end + 1
+        return True
+
+    async def _follow_subscription(self) -> None:
+        """
+        Push mode: subscribe to the token's Transfer logs on ``ws_url``, catch up
+        over HTTP, then record pushed logs in small coalesced batches so the DB
+        still sees one executemany per burst.  Returns when stop() is called,
+        raises when the socket drops.
+        """
+        from web3 import AsyncWeb3, WebsocketProviderV2
+
+        async with AsyncWeb3.persistent_websocket(WebsocketProviderV2(self.ws_url)) as ws3:
+            await ws3.eth.subscribe("logs", {"address": self.token_addr, "topics": [self.transfer_topic]})
+            # Subscribe first, then catch up: anything mined in between queues
+            # on the socket and is dropped below if the catch-up already has it.
+            self._poll()
+            floor = self._get_metrics()["last_block"]
+            pushed: asyncio.Queue = asyncio.Queue()
+
+            async def read() -> None:
+                async for msg in ws3.ws.process_subscriptions():
+                    pushed.put_nowait(msg["result"])
+
+            reader = asyncio.create_task(read())
+            try:
+                while not self._stop.is_set():
+                    try:
+                        batch = [await asyncio.wait_for(pushed.get(), timeout=1.0)]
+                    except asyncio.TimeoutError:
+                        if reader.done():
+                            reader.result()  # re-raise why the socket closed
+                            return
+                        continue
+                    while True:
+                        try:
+                            batch.append(await asyncio.wait_for(pushed.get(), SUBSCRIPTION_COALESCE_S))
+                        except asyncio.TimeoutError:
+                            break
+                    logs = [_normalize_log(log) for log in batch if not log.get("removed")]
+                    logs = [log for log in logs if log["blockNumber"] > floor]
+                    if logs:
+                        self._record_logs(logs, max(log["blockNumber"] for log in logs))
+            finally:
+                reader.cancel()
+
+    def _process_range(self, start: int, end: int) -> None:
+        """Fetch Transfer logs for blocks ``start..end`` and record them in one transaction."""
         logs = self.w3.eth.get_logs(
             {
-                "fromBlock": last_block + 1,
-                "toBlock": latest_block,
+                "fromBlock": start,
+                "toBlock": end,
                 "address": self.token_addr,
                 "topics": [self.transfer_topic],
             }
         )
-        # Load agents mapping
-        agents = self._load_agents()
-        # Track vendor sales counts for SME metric
-        vendor_sales: Dict[str, int] = {}
+        self._record_logs(logs, end)
+
+    def _record_logs(self, logs, last_block: int) -> None:
+        """Insert ``logs`` and their metric increments, advancing last_block, in one transaction."""
+        # A busy block carries many transfers; fetch each block's header once
+        timestamps = self._block_timestamps(dict.fromkeys(event["blockNumber"] for event in logs))
+        # Only the wallets this batch touches are looked up (topics of non-Transfer
+        # logs just miss; they are skipped below)
+        agents = self._lookup_agents(
+            {"0x" + bytes.hex(topic[-20:]) for event in logs for topic in event["topics"][1:3]}
+        )
+        # Rows and metric increments for the window, written in one transaction
+        rows: List[tuple] = []
+        divisor = self._amount_divisor
+        m1_inc = 0.0
+        leak_inc = 0.0
+        vat_inc = 0.0
         for event in logs:
             tx_hash = event["transactionHash"].hex()
             block_num = event["blockNumber"]
             # Decode topics: Transfer indexed parameters: from, to
             topics = event["topics"]
-            # topics[0] is event signature; topics[1] and topics[2] are indexed parameters
-            from_addr = "0x" + topics[1].hex()[-40:]
-            to_addr = "0x" + topics[2].hex()[-40:]
-            from_addr = Web3.to_checksum_address(from_addr)
-            to_addr = Web3.to_checksum_address(to_addr)
-            # Data holds the value
-            value = int(event["data"], 16)
-            amount_ui = value / (10 ** 6)  # assume 6 decimals (USDC style)
-            # Get timestamp
-            block = self.w3.eth.get_block(block_num)
-            ts = block["timestamp"]
+            if len(topics) != 3 or topics[0] != TRANSFER_TOPIC:
+                continue  # not an ERC-20 Transfer (e.g. an ERC-721 one with the id indexed)
+            # topics[0] is event signature; topics[1] and topics[2] are indexed parameters.
+            # Only the low 20 bytes are the address, so just those are hex-encoded
+            # (bytes.hex: lowercase and unprefixed whatever the HexBytes version).
+            from_addr = "0x" + bytes.hex(topics[1][-20:])
+            to_addr = "0x" + bytes.hex(topics[2][-20:])
+            # Data holds the value (HexBytes from web3; hex text from older providers)
+            data = event["data"]
+            if isinstance(data, str):
+                data = bytes.fromhex(data[2:] if data.startswith("0x") else data)
+            value = int.from_bytes(data, "big")
+            amount_ui = value / divisor
+            ts = timestamps[block_num]
             # Classification
-            is_mint = int(from_addr.lower() == "0x0000000000000000000000000000000000000000")
+            is_mint = int(from_addr == "0x0000000000000000000000000000000000000000")
             # Look up tiers
-            tier_from = agents.get(from_addr.lower(), {}).get("tier", -1)
-            tier_to = agents.get(to_addr.lower(), {}).get("tier", -1)
+            from_agent = agents.get(from_addr, {})
+            to_agent = agents.get(to_addr, {})
+            tier_from = from_agent.get("tier", -1)
+            tier_to = to_agent.get("tier", -1)
             # Eligible if to_addr is a registered vendor
-            eligible = int(agents.get(to_addr.lower(), {}).get("type") == "vendor")
-            # Insert into transactions
-            self._insert_transaction(
-                txid=tx_hash,
-                ts=ts,
-                block_number=block_num,
-                from_address=from_addr,
-                to_address=to_addr,
-                amount_raw=value,
-                amount_ui=amount_ui,
-                tier_from=tier_from,
-                tier_to=tier_to,
-                is_mint=is_mint,
-                eligible=eligible,
+            eligible = int(to_agent.get("type") == "vendor")
+            rows.append(
+                (tx_hash, ts, block_num, from_addr, to_addr, value, amount_ui, tier_from, tier_to, is_mint, eligible, "")
             )
-            # Update metrics
             # M1: add minted amounts and eligible spends
-            m1_inc = 0.0
-            leak_inc = 0.0
-            vat_inc = 0.0
             if is_mint:
                 m1_inc += amount_ui
             else:
                 if eligible:
                     m1_inc += amount_ui
                     vat_inc += self.tau * amount_ui
-                    # Count SME sales
-                    vendor_sales[to_addr.lower()] = vendor_sales.get(to_addr.lower(), 0) + 1
                 else:
                     leak_inc += amount_ui
-            self._update_metrics(m1_inc, leak_inc, vat_inc)
-        # Update SME count based on sales counts threshold
-        current_metrics = self._get_metrics()
-        active_smes = current_metrics["smes_active"]
-        threshold = 3  # simple threshold: at least 3 sales
-        count_active = len([addr for addr, cnt in vendor_sales.items() if cnt >= threshold])
-        if count_active != active_smes:
-            # Update metrics with new smes_active count
-            self._update_metrics(smes_active=count_active)
-        # Update last_block
-        self._update_metrics(last_block=latest_block)
-
-    def _insert_transaction(
-        self,
-        txid: str,
-        ts: int,
-        block_number: int,
-        from_address: str,
-        to_address: str,
-        amount_raw: int,
-        amount_ui: float,
-        tier_from: int,
-        tier_to: int,
-        is_mint: int,
-        eligible: int,
-        notes: str = "",
-    ) -> None:
-        """Insert a transaction record into the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute(
-                """
-                INSERT INTO transactions (txid, ts, block_number, from_address, to_address, amount_raw, amount_ui, tier_from, tier_to, is_mint, eligible, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    txid,
-                    ts,
-                    block_number,
-                    from_address,
-                    to_address,
-                    amount_raw,
-                    amount_ui,
-                    tier_from,
-                    tier_to,
-                    is_mint,
-                    eligible,
-                    notes,
-                ),
-            )
-            conn.commit()
+        # Insert rows, bump metrics and advance last_block together: one commit per batch
+        with self._db() as conn:
+            conn.executemany(_INSERT_TX_SQL, rows)
+            conn.execute(_UPDATE_METRICS_SQL, (m1_inc, leak_inc, vat_inc, SME_SALES_THRESHOLD, last_block))
 
-    def _load_agents(self) -> Dict[str, Dict[str, any]]:
-        """Load agent information from the database into a dict keyed by wallet address (lowercase)."""
-        agents = {}
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute("""SELECT wallet, type, province, tier, meta_json FROM agents""")
-            for row in c.fetchall():
-                wallet = row[0].lower()
-                agents[wallet] = {
+    def invalidate_agents(self) -> None:
+        """Force the next poll to re-read agents from the table."""
+        self._agents_version = None
+
+    def _lookup_agents(self, wallets: Set[str]) -> Dict[str, Dict[str, any]]:
+        """
+        Agent information for ``wallets`` (lowercase addresses), keyed by wallet;
+        wallets with no agent are left out.  Lookups, misses included, are cached
+        until another connection commits to the DB (PRAGMA data_version moves),
+        since agents are registered by the agent scripts, not by the watcher.
+        Uncached wallets are matched case-insensitively through the NOCASE index.
+        """
+        conn = self._db()
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._agents_version:
+            self._agents = {}
+            self._agents_version = version
+        cache = self._agents
+        missing = [wallet for wallet in wallets if wallet not in cache]
+        for i in range(0, len(missing), AGENT_LOOKUP_CHUNK):
+            chunk = missing[i : i + AGENT_LOOKUP_CHUNK]
+            cache.update(dict.fromkeys(chunk))
+            sql = _SELECT_AGENTS_SQL + "(" + ",".join("?" * len(chunk)) + ")"
+            for row in conn.execute(sql, chunk):
+                cache[row[0].lower()] = {
                     "type": row[1],
                     "province": row[2],
                     "tier": row[3],
                     "meta": row[4],
                 }
-        return agents
\ No newline at end of file
+        return {wallet: cache[wallet] for wallet in wallets if cache[wallet] is not None}
@@ -20,7 +20,7 @@ Usage:
 from __future__ import annotations
 import os, time, sqlite3, sys
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Iterable, List, Tuple
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -60,6 +60,9 @@ FUND_PER_SENDER_WEI = int(os.getenv("FUND_PER_SENDER_WEI", str(5 * 10**16)))  #
 GAS_LIMIT_ERC20_TRANSFER = int(os.getenv("GAS_LIMIT_ERC20_TRANSFER", "120000"))
 GAS_LIMIT_NATIVE_XFER    = 21000
 
+# Receipt polling interval (web3's default 0.1 s trips rate limits on public RPCs)
+RECEIPT_POLL_SEC = float(os.getenv("RECEIPT_POLL_SEC", "2.0"))
+
 TOKEN_DECIMALS_DEFAULT = 6
 
 # ---------- Minimal ABI ----------
@@ -104,14 +107,21 @@ CREATE TABLE IF NOT EXISTS transactions (
   eligible INTEGER,
   notes TEXT
 );
+CREATE INDEX IF NOT EXISTS idx_tx_block ON transactions(block_number);
+CREATE INDEX IF NOT EXISTS idx_tx_to_addr ON transactions(to_address);
+CREATE INDEX IF NOT EXISTS idx_tx_from_addr ON transactions(from_address);
+CREATE INDEX IF NOT EXISTS idx_tx_txid ON transactions(txid);
+DROP INDEX IF EXISTS idx_tx_eligible;
+CREATE INDEX IF NOT EXISTS idx_tx_eligible_nocase ON transactions(to_address COLLATE NOCASE) WHERE eligible=1;
 CREATE TABLE IF NOT EXISTS agents (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
-  wallet TEXT UNIQUE NOT NULL,
+  wallet TEXT UNIQUE NOT NULL COLLATE NOCASE,
   type TEXT,
   province TEXT,
   tier INTEGER,
   meta_json TEXT
 );
+CREATE INDEX IF NOT EXISTS idx_agents_wallet_nocase ON agents(wallet COLLATE NOCASE);
 CREATE TABLE IF NOT EXISTS metrics (
   id INTEGER PRIMARY KEY CHECK (id = 1),
   m1_obs REAL,
@@ -122,9 +132,20 @@ CREATE TABLE IF NOT EXISTS metrics (
 );
 """
 
+def _open_db(path) -> sqlite3.Connection:
+    """Connect with WAL + NORMAL sync and a busy timeout (the watcher and API share this DB)."""
+    conn = sqlite3.connect(str(path), timeout=5.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
 def ensure_schema(db: Path) -> None:
     db.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(str(db)) as conn:
+    with _open_db(db) as conn:
         conn.executescript(SCHEMA_SQL)
         cur = conn.execute("SELECT 1 FROM metrics WHERE id=1")
         if cur.fetchone() is None:
@@ -132,7 +153,7 @@ def ensure_schema(db: Path) -> None:
         conn.commit()
 
 def seed_agents(payer: str, vendor: str) -> None:
-    with sqlite3.connect(str(DB_PATH)) as conn:
+    with _open_db(DB_PATH) as conn:
         conn.execute(
             "INSERT OR IGNORE INTO agents (wallet, type, province, tier, meta_json) VALUES (?,?,?,?,?)",
             (payer.lower(), "payer", "", 1, "{}"),
@@ -143,21 +164,24 @@ def seed_agents(payer: str, vendor: str) -> None:
         )
         conn.commit()
 
-def insert_row(*, txid: str, ts: int, block_number: int,
-               from_addr: str, to_addr: str,
-               amount_raw: int, amount_ui: float,
-               is_mint: int, eligible: int,
-               notes: str, tier_from: int = 1, tier_to: int = 1) -> None:
-    with sqlite3.connect(str(DB_PATH)) as conn:
-        conn.execute(
-            """INSERT INTO transactions
-               (txid, ts, block_number, from_address, to_address,
-                amount_raw, amount_ui, tier_from, tier_to, is_mint, eligible, notes)
-               VALUES (?,?,?,?,?,?,?,?,?,?,?,?)""",
-            (txid, ts, block_number, from_addr.lower(), to_addr.lower(),
-             int(amount_raw), float(amount_ui), int(tier_from), int(tier_to),
-             int(is_mint), int(eligible), notes),
-        )
+INSERT_TX_SQL = """INSERT INTO transactions
+   (txid, ts, block_number, from_address, to_address,
+    amount_raw, amount_ui, tier_from, tier_to, is_mint, eligible, notes)
+   VALUES (?,?,?,?,?,?,?,?,?,?,?,?)"""
+
+def tx_row(*, txid: str, ts: int, block_number: int,
+           from_addr: str, to_addr: str,
+           amount_raw: int, amount_ui: float,
+           is_mint: int, eligible: int,
+           notes: str, tier_from: int = 1, tier_to: int = 1) -> tuple:
+    """One transactions row, in INSERT_TX_SQL column order (values bound as given)."""
+    return (txid, ts, block_number, from_addr.lower(), to_addr.lower(),
+            amount_raw, amount_ui, tier_from, tier_to, is_mint, eligible, notes)
+
+def insert_rows(rows: Iterable[tuple]) -> None:
+    """Insert a flow's rows in one transaction (one commit instead of one per row)."""
+    with _open_db(DB_PATH) as conn:
+        conn.executemany(INSERT_TX_SQL, rows)
         conn.commit()
 
 # ---------- Chain helpers ----------
@@ -170,14 +194,29 @@ def fee_params(w3: Web3) -> Tuple[int,int]:
         tip = max(1, w3.eth.gas_price // 10_000)
     return int(base + tip * 2), int(tip)
 
-def send_tx(w3: Web3, tx: dict, pk: str):
+_BLOCK_TS: Dict[int, int] = {}
+
+def block_ts(w3: Web3, block_number: int) -> int:
+    """Block timestamp, fetched once per block (legs mined in the same block share it)."""
+    ts = _BLOCK_TS.get(block_number)
+    if ts is None:
+        ts = _BLOCK_TS[block_number] = int(w3.eth.get_block(block_number)["timestamp"])
+    return ts
+
+def broadcast_tx(w3: Web3, tx: dict, pk: str):
+    """Sign and send without waiting; returns the tx hash."""
     signed = w3.eth.account.sign_transaction(tx, private_key=pk)
-    txh = w3.eth.send_raw_transaction(signed.raw_transaction)
-    rcpt = w3.eth.wait_for_transaction_receipt(txh, timeout=240)
+    return w3.eth.send_raw_transaction(signed.raw_transaction)
+
+def wait_tx(w3: Web3, txh):
+    rcpt = w3.eth.wait_for_transaction_receipt(txh, timeout=240, poll_latency=RECEIPT_POLL_SEC)
     if rcpt.status != 1:
         raise RuntimeError(f"Tx failed: {txh.hex()}")
     return txh.hex(), rcpt
 
+def send_tx(w3: Web3, tx: dict, pk: str):
+    return wait_tx(w3, broadcast_tx(w3, tx, pk))
+
 # ---------- Flow ----------
 def try_onchain() -> Dict[str, Any]:
     w3 = Web3(Web3.HTTPProvider(RPC_URL))
@@ -189,6 +228,7 @@ def try_onchain() -> Dict[str, Any]:
         decimals = token.functions.decimals().call()
     except Exception:
         decimals = TOKEN_DECIMALS_DEFAULT
+    scale = 10 ** decimals
 
     deployer = Account.from_key(DEPLOYER_PK)
     A = Account.from_key(A_PK)
@@ -198,70 +238,73 @@ def try_onchain() -> Dict[str, Any]:
     max_fee, tip = fee_params(w3)
 
     out: Dict[str, Any] = {"steps": [], "mode":"on_chain", "errors":[]}
-
-    # mint to A
-    nonce_dep = w3.eth.get_transaction_count(deployer.address)
-    mint_raw = int(MINT_TO_A_UI * (10 ** decimals))
-    tx_mint = token.functions.mint(Web3.to_checksum_address(A.address), mint_raw).build_transaction({
-        "from": deployer.address, "nonce": nonce_dep, "chainId": CHAIN_ID,
-        "type": 2, "maxFeePerGas": max_fee, "maxPriorityFeePerGas": tip,
-        "gas": 200_000, "value": 0,
-    })
-    mint_txh, mint_rcpt = send_tx(w3, tx_mint, DEPLOYER_PK)
-    out["steps"].append({"mint_to_A_tx": mint_txh})
-    blk = w3.eth.get_block(mint_rcpt.blockNumber)
-    insert_row(
-        txid=mint_txh, ts=int(blk["timestamp"]), block_number=mint_rcpt.blockNumber,
-        from_addr="0x0000000000000000000000000000000000000000", to_addr=A.address,
-        amount_raw=mint_raw, amount_ui=MINT_TO_A_UI,
-        is_mint=1, eligible=0, notes="mint", tier_from=0, tier_to=1
-    )
-
-    # fund A & B native
-    nonce_dep += 1
-    for target in (A.address, B.address):
-        tx = {
+    # Rows are written together at the end; legs that completed are still
+    # recorded if a later one fails.
+    rows: List[tuple] = []
+    try:
+        # Deployer legs: mint to A, then fund A & B native. Their nonces are
+        # consecutive, so all three are signed and sent back-to-back and then
+        # awaited together (one block on the critical path instead of three).
+        nonce_dep = w3.eth.get_transaction_count(deployer.address)
+        mint_raw = int(MINT_TO_A_UI * scale)
+        tx_mint = token.functions.mint(Web3.to_checksum_address(A.address), mint_raw).build_transaction({
+            "from": deployer.address, "nonce": nonce_dep, "chainId": CHAIN_ID,
+            "type": 2, "maxFeePerGas": max_fee, "maxPriorityFeePerGas": tip,
+            "gas": 200_000, "value": 0,
+        })
+        fund_targets = (A.address, B.address)
+        fund_txs = [{
             "to": Web3.to_checksum_address(target), "value": FUND_PER_SENDER_WEI,
-            "nonce": nonce_dep, "chainId": CHAIN_ID, "type": 2,
+            "nonce": nonce_dep + 1 + i, "chainId": CHAIN_ID, "type": 2,
             "maxFeePerGas": max_fee, "maxPriorityFeePerGas": tip, "gas": GAS_LIMIT_NATIVE_XFER,
-        }
-        fund_txh, _ = send_tx(w3, tx, DEPLOYER_PK)
-        out["steps"].append({"fund_native": {"target": target, "tx": fund_txh}})
-        nonce_dep += 1
-
-    # A -> B
-    a2b_raw = int(TRANSFER_A_TO_B_UI * (10 ** decimals))
-    nonceA = w3.eth.get_transaction_count(A.address)
-    tx1 = token.functions.transfer(Web3.to_checksum_address(B.address), a2b_raw).build_transaction({
-        "from": A.address, "nonce": nonceA, "chainId": CHAIN_ID, "type": 2,
-        "maxFeePerGas": max_fee, "maxPriorityFeePerGas": tip, "gas": GAS_LIMIT_ERC20_TRANSFER,
-    })
-    a2b_txh, a2b_rcpt = send_tx(w3, tx1, A.key.hex())
-    out["steps"].append({"A_to_B_tx": a2b_txh})
-    blk = w3.eth.get_block(a2b_rcpt.blockNumber)
-    insert_row(
-        txid=a2b_txh, ts=int(blk["timestamp"]), block_number=a2b_rcpt.blockNumber,
-        from_addr=A.address, to_addr=B.address,
-        amount_raw=a2b_raw, amount_ui=TRANSFER_A_TO_B_UI,
-        is_mint=0, eligible=1, notes="A->B", tier_from=1, tier_to=1
-    )
-
-    # B -> C
-    b2c_raw = int(TRANSFER_B_TO_C_UI * (10 ** decimals))
-    nonceB = w3.eth.get_transaction_count(B.address)
-    tx2 = token.functions.transfer(C, b2c_raw).build_transaction({
-        "from": B.address, "nonce": nonceB, "chainId": CHAIN_ID, "type": 2,
-        "maxFeePerGas": max_fee, "maxPriorityFeePerGas": tip, "gas": GAS_LIMIT_ERC20_TRANSFER,
-    })
-    b2c_txh, b2c_rcpt = send_tx(w3, tx2, B.key.hex())
-    out["steps"].append({"B_to_C_tx": b2c_txh})
-    blk = w3.eth.get_block(b2c_rcpt.blockNumber)
-    insert_row(
-        txid=b2c_txh, ts=int(blk["timestamp"]), block_number=b2c_rcpt.blockNumber,
-        from_addr=B.address, to_addr=C,
-        amount_raw=b2c_raw, amount_ui=TRANSFER_B_TO_C_UI,
-        is_mint=0, eligible=0, notes="B->C", tier_from=1, tier_to=1
-    )
+        } for i, target in enumerate(fund_targets)]
+        deployer_hashes = [broadcast_tx(w3, tx, DEPLOYER_PK) for tx in [tx_mint] + fund_txs]
+
+        mint_txh, mint_rcpt = wait_tx(w3, deployer_hashes[0])
+        out["steps"].append({"mint_to_A_tx": mint_txh})
+        rows.append(tx_row(
+            txid=mint_txh, ts=block_ts(w3, mint_rcpt.blockNumber), block_number=mint_rcpt.blockNumber,
+            from_addr="0x0000000000000000000000000000000000000000", to_addr=A.address,
+            amount_raw=mint_raw, amount_ui=MINT_TO_A_UI,
+            is_mint=1, eligible=0, notes="mint", tier_from=0, tier_to=1
+        ))
+        for target, txh in zip(fund_targets, deployer_hashes[1:]):
+            fund_txh, _ = wait_tx(w3, txh)
+            out["steps"].append({"fund_native": {"target": target, "tx": fund_txh}})
+
+        # A -> B
+        a2b_raw = int(TRANSFER_A_TO_B_UI * scale)
+        nonceA = w3.eth.get_transaction_count(A.address)
+        tx1 = token.functions.transfer(Web3.to_checksum_address(B.address), a2b_raw).build_transaction({
+            "from": A.address, "nonce": nonceA, "chainId": CHAIN_ID, "type": 2,
+            "maxFeePerGas": max_fee, "maxPriorityFeePerGas": tip, "gas": GAS_LIMIT_ERC20_TRANSFER,
+        })
+        a2b_txh, a2b_rcpt = send_tx(w3, tx1, A.key.hex())
+        out["steps"].append({"A_to_B_tx": a2b_txh})
+        rows.append(tx_row(
+            txid=a2b_txh, ts=block_ts(w3, a2b_rcpt.blockNumber), block_number=a2b_rcpt.blockNumber,
+            from_addr=A.address, to_addr=B.address,
+            amount_raw=a2b_raw, amount_ui=TRANSFER_A_TO_B_UI,
+            is_mint=0, eligible=1, notes="A->B", tier_from=1, tier_to=1
+        ))
+
+        # B -> C
+        b2c_raw = int(TRANSFER_B_TO_C_UI * scale)
+        nonceB = w3.eth.get_transaction_count(B.address)
+        tx2 = token.functions.transfer(C, b2c_raw).build_transaction({
+            "from": B.address, "nonce": nonceB, "chainId": CHAIN_ID, "type": 2,
+            "maxFeePerGas": max_fee, "maxPriorityFeePerGas": tip, "gas": GAS_LIMIT_ERC20_TRANSFER,
+        })
+        b2c_txh, b2c_rcpt = send_tx(w3, tx2, B.key.hex())
+        out["steps"].append({"B_to_C_tx": b2c_txh})
+        rows.append(tx_row(
+            txid=b2c_txh, ts=block_ts(w3, b2c_rcpt.blockNumber), block_number=b2c_rcpt.blockNumber,
+            from_addr=B.address, to_addr=C,
+            amount_raw=b2c_raw, amount_ui=TRANSFER_B_TO_C_UI,
+            is_mint=0, eligible=0, notes="B->C", tier_from=1, tier_to=1
+        ))
+    finally:
+        insert_rows(rows)
 
     out["tx_count"] = 2
     out["transferred_ui"] = TRANSFER_A_TO_B_UI + TRANSFER_B_TO_C_UI
@@ -269,33 +312,33 @@ def try_onchain() -> Dict[str, Any]:
 
 def simulate_into_db(decimals: int = TOKEN_DECIMALS_DEFAULT) -> Dict[str, Any]:
     now = int(time.time())
-    mint_raw = int(MINT_TO_A_UI * (10 ** decimals))
-    a2b_raw = int(TRANSFER_A_TO_B_UI * (10 ** decimals))
-    b2c_raw = int(TRANSFER_B_TO_C_UI * (10 ** decimals))
+    scale = 10 ** decimals
+    mint_raw = int(MINT_TO_A_UI * scale)
+    a2b_raw = int(TRANSFER_A_TO_B_UI * scale)
+    b2c_raw = int(TRANSFER_B_TO_C_UI * scale)
 
     sim_mint = "0x" + "aa"*32
     sim_a2b  = "0x" + "bb"*32
     sim_b2c  = "0x" + "cc"*32
     blk      = 0
 
-    insert_row(
+    rows = [tx_row(
         txid=sim_mint, ts=now, block_number=blk,
         from_addr="0x0000000000000000000000000000000000000000",
         to_addr=A_ADDR, amount_raw=mint_raw, amount_ui=MINT_TO_A_UI,
         is_mint=1, eligible=0, notes="mint (simulated)", tier_from=0, tier_to=1
-    )
-    insert_row(
+    ), tx_row(
         txid=sim_a2b, ts=now+1, block_number=blk,
         from_addr=A_ADDR, to_addr=B_ADDR,
         amount_raw=a2b_raw, amount_ui=TRANSFER_A_TO_B_UI,
         is_mint=0, eligible=1, notes="A->B (simulated)", tier_from=1, tier_to=1
-    )
-    insert_row(
+    ), tx_row(
         txid=sim_b2c, ts=now+2, block_number=blk,
         from_addr=B_ADDR, to_addr=C_ADDR,
         amount_raw=b2c_raw, amount_ui=TRANSFER_B_TO_C_UI,
         is_mint=0, eligible=0, notes="B->C (simulated)", tier_from=1, tier_to=1
-    )
+    )]
+    insert_rows(rows)
 
     return {"mode":"simulated","tx_count":2,"transferred_ui":TRANSFER_A_TO_B_UI+TRANSFER_B_TO_C_UI}
 
@@ -1,14 +1,18 @@
 # improvise/agent_settle.py
 from __future__ import annotations
-import os, time, sqlite3, json, re, sys
-from typing import Dict, Any, Tuple, List
+import os, time, sqlite3, json, sys, functools
+from typing import Dict, Any, Tuple, List, Optional, Sequence
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # --- allow local imports (for negotiation_demo.py in same folder) ---
 HERE = Path(__file__).resolve().parent
 if str(HERE) not in sys.path:
     sys.path.insert(0, str(HERE))
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from web3 import Web3
 from eth_account import Account
@@ -27,11 +31,15 @@ PAYER_PK      = os.getenv("PAYER_PK") or os.getenv("AGENT_PAYER_PRIVATE_KEY")
 VENDOR_ADDR   = Web3.to_checksum_address(os.getenv("VENDOR_ADDR") or os.getenv("AGENT_VENDOR_ADDR", "0x981F76F4C4a7A6edb0A86480a5A3Cc794A69620a"))
 DEPLOYER_PK   = os.getenv("DEPLOYER_PK", "0x4095553577ba83901a71661f20c666075e248ff78d0c824527de650100c74ddf")
 TOKEN_DEC_FALLBACK = int(os.getenv("TOKEN_DECIMALS_DEFAULT", "6"))
+VERIFY_RPC    = os.getenv("SETTLE_VERIFY_RPC", "1") == "1"
 
 # Gas safety (native ARC) — top up payer if native balance < MIN_GAS_WEI
 MIN_GAS_WEI      = int(os.getenv("MIN_GAS_WEI",      str(30_000_000_000_000_000)))  # 0.03 ARC
 FUND_TOPUP_WEI   = int(os.getenv("FUND_TOPUP_WEI",   str(50_000_000_000_000_000)))  # 0.05 ARC
 
+# Receipt polling interval (web3's default 0.1 s trips rate limits on public RPCs; blocks are ~5 s)
+RECEIPT_POLL_SEC = float(os.getenv("RECEIPT_POLL_SEC", "2.0"))
+
 # =========================
 # Minimal ERC-20 ABI
 # =========================
@@ -67,41 +75,134 @@ MIN_ABI = [
 # =========================
 # Web3 Helpers
 # =========================
+RPC_TIMEOUT = 20
+
+def _rpc_session() -> requests.Session:
+    """
+    Keep-alive session for every RPC call (AUTORUN reuses it across runs).
+    Connection errors and 429/5xx answers are retried with backoff; JSON-RPC
+    calls are all POSTs. A retried eth_sendRawTransaction whose first attempt
+    did reach the node errors ("already known" / "nonce too low"), which
+    _send_raw resolves by looking the tx up by hash.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=5, backoff_factor=0.25,
+            status_forcelist=(429, 502, 503, 504), allowed_methods=("POST",),
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+_SESSION = _rpc_session()
+# decimals() per token address; only successful reads are cached
+_DEC_CACHE: Dict[str, int] = {}
+
+@functools.lru_cache(maxsize=1)
 def _connect_web3() -> Tuple[Web3, Any]:
-    w3 = Web3(Web3.HTTPProvider(RPC_URL))
-    if not w3.is_connected():
+    """Connect once per process; later settlement runs reuse the provider and contract."""
+    w3 = Web3(Web3.HTTPProvider(RPC_URL, session=_SESSION, request_kwargs={"timeout": RPC_TIMEOUT}))
+    # One web3_clientVersion ping per process; SETTLE_VERIFY_RPC=0 skips it
+    if VERIFY_RPC and not w3.is_connected():
         raise RuntimeError("RPC not reachable")
     token = w3.eth.contract(address=TOKEN_ADDR, abi=MIN_ABI)
     return w3, token
 
 def _decimals(token) -> int:
+    dec = _DEC_CACHE.get(token.address)
+    if dec is not None:
+        return dec
     try:
-        return int(token.functions.decimals().call())
+        dec = _DEC_CACHE[token.address] = int(token.functions.decimals().call())
     except Exception:
         return TOKEN_DEC_FALLBACK
+    return dec
 
-def _fee_params(w3: Web3) -> Tuple[int, int]:
-    latest = w3.eth.get_block("latest")
-    base = latest.get("baseFeePerGas") or w3.eth.gas_price
+def _rpc_batch(calls: Sequence[Tuple[str, list]]) -> List[Any]:
+    """
+    Send ``(method, params)`` calls as one JSON-RPC batch POST and return the
+    raw results in call order (``None`` where the node answered an error).
+    Falls back to one request per call if the node does not batch.
+    """
+    payload = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+    resp = _SESSION.post(RPC_URL, json=payload, timeout=RPC_TIMEOUT)
+    resp.raise_for_status()
+    body = resp.json()
+    if isinstance(body, list):
+        by_id = {item.get("id"): item for item in body if isinstance(item, dict)}
+        return [by_id.get(i, {}).get("result") for i in range(len(calls))]
+    w3, _ = _connect_web3()
+    return [w3.provider.make_request(method, params).get("result") for method, params in calls]
+
+def _hex_int(value: Optional[str]) -> Optional[int]:
+    return None if value is None else int(value, 16)
+
+def _balance_of_call(token, owner: str) -> Tuple[str, list]:
+    """eth_call for ``token.balanceOf(owner)``, as a _rpc_batch entry."""
+    data = token.encodeABI(fn_name="balanceOf", args=[Web3.to_checksum_address(owner)])
+    return "eth_call", [{"to": token.address, "data": data}, "latest"]
+
+# Set once the node rejects eth_maxPriorityFeePerGas; later fee reads skip it
+_NO_PRIORITY_FEE_RPC = False
+
+def _max_priority_fee(w3: Web3) -> Optional[int]:
+    """Node-suggested tip, or None if the node does not implement it."""
+    global _NO_PRIORITY_FEE_RPC
+    if _NO_PRIORITY_FEE_RPC:
+        return None
     try:
-        tip = getattr(w3.eth, "max_priority_fee")
+        tip = w3.eth.max_priority_fee
+    except ValueError:
+        # JSON-RPC error (method not found): don't ask again
+        _NO_PRIORITY_FEE_RPC = True
+        return None
     except Exception:
-        tip = None
-    if callable(tip):
-        tip = tip()
+        return None
+    return tip() if callable(tip) else tip
+
+def _fee_params(w3: Web3, latest: Optional[dict] = None, tip: Optional[int] = None) -> Tuple[int, int]:
+    """EIP-1559 (max_fee, tip); pass an already-fetched ``latest`` block / tip to skip those reads."""
+    if latest is None:
+        latest = w3.eth.get_block("latest")
+    base = latest.get("baseFeePerGas") or w3.eth.gas_price
+    if tip is None:
+        tip = _max_priority_fee(w3)
     if tip is None:
         tip = max(1, int(base // 10_000))
     max_fee = int(base + int(tip) * 2)
     return max_fee, int(tip)
 
-def _send_signed(w3: Web3, tx: dict, pk: str) -> Tuple[str, dict]:
-    signed = w3.eth.account.sign_transaction(tx, private_key=pk)
+def _send_raw(w3: Web3, signed) -> bytes:
+    """
+    Broadcast a signed tx and return its hash. If the send errors (a JSON-RPC
+    rejection, or retries running out on timeouts) but the node already has
+    a tx with this hash, e.g. the first attempt of a retried POST, that
+    counts as sent.
+    """
     # web3.py v5 uses rawTransaction; v6 uses raw_transaction
     raw = getattr(signed, "rawTransaction", None) or getattr(signed, "raw_transaction", None)
     if raw is None:
         raise RuntimeError("SignedTransaction missing raw payload (rawTransaction/raw_transaction)")
-    txh = w3.eth.send_raw_transaction(raw)
-    rcpt = w3.eth.wait_for_transaction_receipt(txh, timeout=240)
+    try:
+        return w3.eth.send_raw_transaction(raw)
+    except (ValueError, requests.RequestException) as exc:
+        try:
+            w3.eth.get_transaction(signed.hash)
+        except Exception:
+            raise exc from None
+        return signed.hash
+
+def _send_signed(w3: Web3, tx: dict, pk: str) -> Tuple[str, dict]:
+    signed = w3.eth.account.sign_transaction(tx, private_key=pk)
+    txh = _send_raw(w3, signed)
+    rcpt = w3.eth.wait_for_transaction_receipt(txh, timeout=240, poll_latency=RECEIPT_POLL_SEC)
     if (rcpt.get("status", 0) if isinstance(rcpt, dict) else getattr(rcpt, "status", 0)) != 1:
         raise RuntimeError(f"Tx failed: {txh.hex()}")
     return txh.hex(), rcpt
@@ -113,34 +214,32 @@ def fund_native_if_needed(
     min_gas_wei: int,
     topup_wei: int,
     chain_id: int,
-) -> None:
+    balance: Optional[int] = None,
+    fees: Optional[Tuple[int, int]] = None,
+    nonce: Optional[int] = None,
+    wait: bool = True,
+) -> Optional[bytes]:
     """
     Ensure target has enough native ARC for gas. If not, send topup from deployer.
-    No-op if deployer key not provided.
+    No-op if deployer key not provided. ``balance`` / ``fees`` / the deployer's
+    ``nonce`` may be passed in when the caller has already read them. Returns
+    the topup tx hash (None if none was sent); with ``wait=False`` the caller
+    awaits its receipt.
     """
     if not deployer_pk:
-        return
+        return None
     target_addr = Web3.to_checksum_address(target_addr)
-    bal = w3.eth.get_balance(target_addr)
+    bal = w3.eth.get_balance(target_addr) if balance is None else balance
     if bal >= min_gas_wei:
-        return
+        return None
 
     funder = Account.from_key(deployer_pk)
-    base = w3.eth.get_block("latest").get("baseFeePerGas") or w3.eth.gas_price
-    try:
-        tip = getattr(w3.eth, "max_priority_fee")
-    except Exception:
-        tip = None
-    if callable(tip):
-        tip = tip()
-    if tip is None:
-        tip = max(1, int(base // 10_000))
-    max_fee = int(base + int(tip) * 2)
+    max_fee, tip = fees or _fee_params(w3)
 
     tx = {
         "to": target_addr,
         "value": int(topup_wei),
-        "nonce": w3.eth.get_transaction_count(funder.address),
+        "nonce": w3.eth.get_transaction_count(funder.address) if nonce is None else nonce,
         "chainId": chain_id,
         "type": 2,
         "maxFeePerGas": max_fee,
@@ -148,95 +247,133 @@ def fund_native_if_needed(
         "gas": 21_000,
     }
     signed = w3.eth.account.sign_transaction(tx, private_key=deployer_pk)
-    raw = getattr(signed, "rawTransaction", None) or getattr(signed, "raw_transaction", None)
-    txh = w3.eth.send_raw_transaction(raw)
-    w3.eth.wait_for_transaction_receipt(txh, timeout=180)
+    txh = _send_raw(w3, signed)
+    if wait:
+        w3.eth.wait_for_transaction_receipt(txh, timeout=180, poll_latency=RECEIPT_POLL_SEC)
+    return txh
 
 # =========================
 # Database Utilities
 # =========================
-def _insert_tx_row(
+def _open_db(path) -> sqlite3.Connection:
+    """Connect with WAL + NORMAL sync and a busy timeout (the watcher and API share this DB)."""
+    conn = sqlite3.connect(str(path), timeout=5.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+_TX_SCHEMA_SQL = """
+  CREATE TABLE IF NOT EXISTS transactions(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    txid TEXT, ts INTEGER, block_number INTEGER,
+    from_address TEXT, to_address TEXT,
+    amount_raw INTEGER, amount_ui REAL,
+    tier_from INTEGER, tier_to INTEGER,
+    is_mint INTEGER, eligible INTEGER, notes TEXT
+  )
+"""
+
+# Same index names as the watcher and agent_chain, so whichever runs first creates them
+_TX_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_tx_block ON transactions(block_number)",
+    "CREATE INDEX IF NOT EXISTS idx_tx_to_addr ON transactions(to_address)",
+    "CREATE INDEX IF NOT EXISTS idx_tx_from_addr ON transactions(from_address)",
+    "CREATE INDEX IF NOT EXISTS idx_tx_txid ON transactions(txid)",
+    "DROP INDEX IF EXISTS idx_tx_eligible",
+    "CREATE INDEX IF NOT EXISTS idx_tx_eligible_nocase ON transactions(to_address COLLATE NOCASE) WHERE eligible=1",
+)
+
+_NEGOTIATION_LOG_SCHEMA_SQL = """
+  CREATE TABLE IF NOT EXISTS negotiation_log(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    payer TEXT, vendor TEXT, auditor TEXT,
+    transcript TEXT, final_settlement TEXT
+  )
+"""
+
+_DB: Optional[sqlite3.Connection] = None
+
+def _db() -> sqlite3.Connection:
+    """The script's one connection, opened (and its tables created) on first use."""
+    global _DB
+    if _DB is None:
+        os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+        conn = _open_db(DB_PATH)
+        conn.execute(_TX_SCHEMA_SQL)
+        for ddl in _TX_INDEX_SQL:
+            conn.execute(ddl)
+        conn.execute(_NEGOTIATION_LOG_SCHEMA_SQL)
+        conn.commit()
+        _DB = conn
+    return _DB
+
+_INSERT_TX_SQL = """
+  INSERT INTO transactions
+    (txid, ts, block_number, from_address, to_address,
+     amount_raw, amount_ui, tier_from, tier_to, is_mint, eligible, notes)
+  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_NEGOTIATION_LOG_SQL = """
+  INSERT INTO negotiation_log (payer, vendor, auditor, transcript, final_settlement)
+  VALUES (?, ?, ?, ?, ?)
+"""
+
+def _tx_row(
     txid: str, ts: int, block_number: int,
     from_addr: str, to_addr: str,
     amount_raw: int, amount_ui: float,
     is_mint: int, eligible: int, notes: str,
     tier_from: int = 1, tier_to: int = 1,
-) -> None:
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
-        c = conn.cursor()
-        c.execute("""
-          CREATE TABLE IF NOT EXISTS transactions(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            txid TEXT, ts INTEGER, block_number INTEGER,
-            from_address TEXT, to_address TEXT,
-            amount_raw INTEGER, amount_ui REAL,
-            tier_from INTEGER, tier_to INTEGER,
-            is_mint INTEGER, eligible INTEGER, notes TEXT
-          )
-        """)
-        c.execute("""
-          INSERT INTO transactions
-            (txid, ts, block_number, from_address, to_address,
-             amount_raw, amount_ui, tier_from, tier_to, is_mint, eligible, notes)
-          VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            txid, ts, block_number,
-            from_addr.lower(), to_addr.lower(),
-            int(amount_raw), float(amount_ui),
-            int(tier_from), int(tier_to),
-            int(is_mint), int(eligible), notes
-        ))
-        conn.commit()
+) -> tuple:
+    """One transactions row, in _INSERT_TX_SQL column order."""
+    return (
+        txid, ts, block_number,
+        from_addr.lower(), to_addr.lower(),
+        int(amount_raw), float(amount_ui),
+        int(tier_from), int(tier_to),
+        int(is_mint), int(eligible), notes
+    )
 
-def _append_negotiation_log(transcript: str, final_settlement: dict) -> None:
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("""
-          CREATE TABLE IF NOT EXISTS negotiation_log(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            payer TEXT, vendor TEXT, auditor TEXT,
-            transcript TEXT, final_settlement TEXT
-          )
-        """)
-        conn.execute("""
-          INSERT INTO negotiation_log (payer, vendor, auditor, transcript, final_settlement)
-          VALUES (?, ?, ?, ?, ?)
-        """, (
-            final_settlement.get("payer", "PayerCo"),
-            final_settlement.get("vendor", "VendorLtd"),
-            final_settlement.get("auditor", "AuditBot"),
-            transcript,
-            json.dumps(final_settlement),
-        ))
-        conn.commit()
+def _negotiation_log_row(transcript: str, final_settlement: dict) -> tuple:
+    """One negotiation_log row, in _INSERT_NEGOTIATION_LOG_SQL column order."""
+    return (
+        final_settlement.get("payer", "PayerCo"),
+        final_settlement.get("vendor", "VendorLtd"),
+        final_settlement.get("auditor", "AuditBot"),
+        transcript,
+        json.dumps(final_settlement),
+    )
+
+def _record_settlement(rows: List[tuple], log_row: Optional[tuple] = None) -> None:
+    """Insert a settlement's transaction rows and its negotiation log in one transaction."""
+    if not rows and log_row is None:
+        return
+    conn = _db()
+    with conn:
+        conn.executemany(_INSERT_TX_SQL, rows)
+        if log_row is not None:
+            conn.execute(_INSERT_NEGOTIATION_LOG_SQL, log_row)
 
 # =========================
 # Negotiation (imports your printy demo and parses result)
 # =========================
 def negotiate() -> Tuple[str, dict]:
     """
-    Runs improvise/negotiation_demo.py:main(), captures stdout, and extracts
-    the final settlement JSON. Adds payer/vendor/auditor defaults if missing.
+    Runs improvise/negotiation_demo.py's negotiation with its env settings and
+    returns the transcript text and the final settlement. Adds
+    payer/vendor/auditor defaults if missing.
     """
-    import io, contextlib
-    from negotiation_demo import main as negotiation_main
-
-    buf = io.StringIO()
-    with contextlib.redirect_stdout(buf):
-        negotiation_main()
-    out = buf.getvalue()
-
-    # Extract JSON after "FINAL SETTLEMENT"
-    tail = out.split("FINAL SETTLEMENT")[-1]
-    m = re.search(r"\{.*\}", tail, re.S)
-    settlement: dict = {}
-    if m:
-        try:
-            settlement = json.loads(m.group(0))
-        except json.JSONDecodeError:
-            settlement = {}
+    from negotiation_demo import run_negotiation, negotiation_params
+
+    result = run_negotiation(**negotiation_params())
+    out = "\n".join(f"{m['role']}: {m['content']}" for m in result["transcript"])
+    settlement = result["final_settlement"]
     # ensure fields for logging
     settlement.setdefault("payer", "PayerCo")
     settlement.setdefault("vendor", "VendorLtd")
@@ -247,38 +384,47 @@ def negotiate() -> Tuple[str, dict]:
 # Token Funding (mint) if payer short of token
 # =========================
 def ensure_payer_funded_token(
-    w3: Web3, token, payer_addr: str, need_raw: int, decimals: int
+    w3: Web3, token, payer_addr: str, need_raw: int, decimals: int,
+    balance: Optional[int] = None, fees: Optional[Tuple[int, int]] = None,
+    nonce: Optional[int] = None, rows: Optional[List[tuple]] = None,
 ) -> List[dict]:
+    """Mint the payer's shortfall from the deployer. The mint's row is appended
+    to ``rows`` for the caller to write, or inserted right away if none given."""
     steps: List[dict] = []
     # If you don't have a minter, skip
     if not DEPLOYER_PK:
         return steps
 
     deployer = Account.from_key(DEPLOYER_PK)
-    bal = token.functions.balanceOf(payer_addr).call()
+    bal = token.functions.balanceOf(payer_addr).call() if balance is None else balance
     short = max(0, need_raw - bal)
     if short == 0:
         return steps
 
-    max_fee, tip = _fee_params(w3)
-    nonce_dep = w3.eth.get_transaction_count(deployer.address)
-    tx = token.functions.mint(Web3.to_checksum_address(payer_addr), int(short)).build_transaction({
+    max_fee, tip = fees or _fee_params(w3)
+    nonce_dep = w3.eth.get_transaction_count(deployer.address) if nonce is None else nonce
+    tx = {
+        "to": token.address, "data": token.encodeABI(fn_name="mint", args=[Web3.to_checksum_address(payer_addr), int(short)]),
         "from": deployer.address, "nonce": nonce_dep, "chainId": CHAIN_ID,
         "type": 2, "maxFeePerGas": max_fee, "maxPriorityFeePerGas": tip,
         "gas": 200_000, "value": 0
-    })
+    }
     txh, rcpt = _send_signed(w3, tx, DEPLOYER_PK)
     steps.append({"mint_to_payer_tx": txh})
 
     blk = w3.eth.get_block(rcpt.blockNumber)
     ts = int(blk.get("timestamp", time.time()))
-    _insert_tx_row(
+    row = _tx_row(
         txid=txh, ts=ts, block_number=rcpt.blockNumber,
         from_addr="0x0000000000000000000000000000000000000000",
         to_addr=payer_addr,
         amount_raw=int(short), amount_ui=float(short) / (10 ** decimals),
         is_mint=1, eligible=0, notes="mint for settlement", tier_from=0, tier_to=1
     )
+    if rows is None:
+        _record_settlement([row])
+    else:
+        rows.append(row)
     return steps
 
 # =========================
@@ -298,47 +444,104 @@ def settle_on_chain(transcript: str, settlement: dict) -> Dict[str, Any]:
     total_ui = float(settlement["total_value"])
     raw = int(round(total_ui * (10 ** decimals)))
 
+    # Pre-settlement reads in one batch POST instead of a round-trip each.
+    # The fees from this block price the top-up and mint, and the payer's
+    # nonce holds through them.
+    deployer = Account.from_key(DEPLOYER_PK) if DEPLOYER_PK else None
+    calls = [
+        ("eth_getBlockByNumber", ["latest", False]),
+        ("eth_getBalance", [payer.address, "latest"]),
+        ("eth_getTransactionCount", [payer.address, "latest"]),
+        _balance_of_call(token, payer.address),
+        ("eth_maxPriorityFeePerGas", []),
+    ]
+    if deployer is not None:
+        calls.append(("eth_getTransactionCount", [deployer.address, "latest"]))
+    latest, gas_bal, nonce, tok_bal, tip, *dep_nonce = _rpc_batch(calls)
+    if latest is not None:
+        latest = {"baseFeePerGas": _hex_int(latest.get("baseFeePerGas"))}
+    fees = _fee_params(w3, latest, _hex_int(tip))
+    nonce = _hex_int(nonce)
+    if nonce is None:
+        nonce = w3.eth.get_transaction_count(payer.address)
+
+    # The top-up and the mint both come from the deployer: their nonces are
+    # allocated up front so the top-up is sent without waiting and its
+    # confirmation overlaps the mint's instead of preceding it.
+    dep_nonce = _hex_int(dep_nonce[0]) if dep_nonce else None
+    if deployer is not None and dep_nonce is None:
+        dep_nonce = w3.eth.get_transaction_count(deployer.address)
+
     # 0) Ensure payer has native gas (auto top-up from deployer if configured)
-    fund_native_if_needed(
+    topup_txh = fund_native_if_needed(
         w3=w3,
         deployer_pk=DEPLOYER_PK,
         target_addr=payer.address,
         min_gas_wei=MIN_GAS_WEI,
         topup_wei=FUND_TOPUP_WEI,
         chain_id=CHAIN_ID,
+        balance=_hex_int(gas_bal),
+        fees=fees,
+        nonce=dep_nonce,
+        wait=False,
     )
+    if topup_txh is not None:
+        dep_nonce += 1
 
-    # 1) Ensure payer has enough token (mint from deployer if short)
-    steps = ensure_payer_funded_token(w3, token, payer.address, raw, decimals)
-
-    # 2) Send settlement transfer
-    max_fee, tip = _fee_params(w3)
-    nonce = w3.eth.get_transaction_count(payer.address)
-    tx = token.functions.transfer(vendor, raw).build_transaction({
-        "from": payer.address, "nonce": nonce, "chainId": CHAIN_ID,
-        "type": 2, "maxFeePerGas": max_fee, "maxPriorityFeePerGas": tip,
-        "gas": 120_000, "value": 0
-    })
-    txh, rcpt = _send_signed(w3, tx, PAYER_PK)
-    steps.append({"settle_tx": txh})
-
-    # 3) Record normalized row
-    blk = w3.eth.get_block(rcpt.blockNumber)
-    ts = int(blk.get("timestamp", time.time()))
-    _insert_tx_row(
-        txid=txh, ts=ts, block_number=rcpt.blockNumber,
-        from_addr=payer.address, to_addr=vendor,
-        amount_raw=raw, amount_ui=total_ui,
-        is_mint=0, eligible=1, notes="settlement: negotiation",
-        tier_from=1, tier_to=1
-    )
-
-    # 4) Record negotiation log
-    _append_negotiation_log(transcript, settlement)
-
-    # 5) Balances after
-    bal_p = token.functions.balanceOf(payer.address).call()
-    bal_v = token.functions.balanceOf(vendor).call()
+    # Mint row, settlement row and negotiation log are committed together (3);
+    # a mint whose settlement then fails is still recorded.
+    rows: List[tuple] = []
+    log_row: Optional[tuple] = None
+    try:
+        # 1) Ensure payer has enough token (mint from deployer if short)
+        steps = ensure_payer_funded_token(
+            w3, token, payer.address, raw, decimals,
+            balance=_hex_int(tok_bal), fees=fees, nonce=dep_nonce, rows=rows,
+        )
+        if topup_txh is not None:
+            # Already mined if the mint (next nonce) was
+            w3.eth.wait_for_transaction_receipt(topup_txh, timeout=180, poll_latency=RECEIPT_POLL_SEC)
+
+        # 2) Send settlement transfer. If a top-up or mint was sent, blocks have
+        # passed since the pre-settlement read, and max_fee has no headroom
+        # over that base fee: re-read fees so the transfer stays includable.
+        if topup_txh is not None or steps:
+            fees = _fee_params(w3)
+        max_fee, tip = fees
+        tx = {
+            "to": token.address, "data": token.encodeABI(fn_name="transfer", args=[vendor, raw]),
+            "from": payer.address, "nonce": nonce, "chainId": CHAIN_ID,
+            "type": 2, "maxFeePerGas": max_fee, "maxPriorityFeePerGas": tip,
+            "gas": 120_000, "value": 0
+        }
+        txh, rcpt = _send_signed(w3, tx, PAYER_PK)
+        steps.append({"settle_tx": txh})
+
+        # Block timestamp and balances after, in one batch POST
+        blk, bal_p, bal_v = _rpc_batch([
+            ("eth_getBlockByNumber", [hex(rcpt.blockNumber), False]),
+            _balance_of_call(token, payer.address),
+            _balance_of_call(token, vendor),
+        ])
+        bal_p = _hex_int(bal_p)
+        bal_v = _hex_int(bal_v)
+        if bal_p is None:
+            bal_p = token.functions.balanceOf(payer.address).call()
+        if bal_v is None:
+            bal_v = token.functions.balanceOf(vendor).call()
+
+        ts = _hex_int((blk or {}).get("timestamp")) or int(time.time())
+        rows.append(_tx_row(
+            txid=txh, ts=ts, block_number=rcpt.blockNumber,
+            from_addr=payer.address, to_addr=vendor,
+            amount_raw=raw, amount_ui=total_ui,
+            is_mint=0, eligible=1, notes="settlement: negotiation",
+            tier_from=1, tier_to=1
+        ))
+        log_row = _negotiation_log_row(transcript, settlement)
+    finally:
+        # 3) Record normalized rows and the negotiation log
+        _record_settlement(rows, log_row)
 
     return {
         "mode": "on_chain",
@@ -359,10 +562,7 @@ def settle_on_chain(transcript: str, settlement: dict) -> Dict[str, Any]:
 # =========================
 # Entrypoint
 # =========================
-def _once_verbose() -> None:
-    print(f"[settle] DB: {DB_PATH}")
-    print("[settle] Negotiating…")
-    transcript, settlement = negotiate()
+def _settle_verbose(transcript: str, settlement: dict) -> None:
     print("\n=== NEGOTIATION ===")
     print(json.dumps(settlement, indent=2))
     print("[settle] Settling on ArcNet…")
@@ -371,6 +571,36 @@ def _once_verbose() -> None:
     print(json.dumps(res, indent=2))
     print(f"[settle] Done. Tx: {res['txid']}")
 
+def _once_verbose() -> None:
+    print(f"[settle] DB: {DB_PATH}")
+    print("[settle] Negotiating…")
+    transcript, settlement = negotiate()
+    _settle_verbose(transcript, settlement)
+
+def _autorun(interval: int) -> None:
+    """
+    Settle every ``interval`` seconds. The next negotiation (LLM calls) runs on
+    a worker thread while the current settlement waits for its receipts;
+    settlements themselves stay one at a time, as they share signer nonces.
+    """
+    print(f"[settle] DB: {DB_PATH}")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(negotiate)
+        while True:
+            try:
+                transcript, settlement = pending.result()
+            except Exception as e:
+                print("[settle] ERROR in loop:", e)
+                pending = pool.submit(negotiate)
+                time.sleep(interval)
+                continue
+            pending = pool.submit(negotiate)
+            try:
+                _settle_verbose(transcript, settlement)
+            except Exception as e:
+                print("[settle] ERROR in loop:", e)
+            time.sleep(interval)
+
 def main() -> None:
     _once_verbose()
 
@@ -386,9 +616,4 @@ if __name__ == "__main__":
             raise
     else:
         print(f"[settle] AUTORUN=1 (interval={INTERVAL}s). Looping…")
-        while True:
-            try:
-                _once_verbose()
-            except Exception as e:
-                print("[settle] ERROR in loop:", e)
-            time.sleep(INTERVAL)
\ No newline at end of file
+        _autorun(INTERVAL)
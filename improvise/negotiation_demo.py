@@ -24,27 +24,47 @@ Environment toggles (optional):
 """
 
 import os
+import re
 import json
 from typing import Dict, List, Any
 
+# Number extraction for the heuristic agents and the per-round auditor terms
+_PRICE_RE = re.compile(r"\b(\d+(?:\.\d+)?)\s*(?:USD|usd|\$|THB)?\b")
+_DAYS_RE = re.compile(r"\b(\d+)\s*(?:day|days)\b")
+_NUM_RE = re.compile(r"([0-9]+(?:\.[0-9]+)?)")
+_AUDITOR_DAYS_RE = re.compile(r"(\d+)\s*days", re.I)
+
 # ---------- Optional LLM adapter ----------
+_UNRESOLVED = object()
+# llm_handler's entry point, looked up on first use (None: no usable handler)
+_LLM_FN: Any = _UNRESOLVED
+
+def _resolve_llm():
+    try:
+        import llm_handler  # type: ignore
+    except Exception:
+        return None
+    # Many users expose call_LLM at top-level; if not, try fallback names.
+    for name in ("call_LLM", "call_llm", "generate"):
+        fn = getattr(llm_handler, name, None)
+        if fn is not None:
+            return fn
+    return None
+
 def _llm_call(model: str, prompt: str) -> str:
     """
     If llm_handler.call_LLM(model, prompt) exists, use it.
     Else return a deterministic heuristic text so the flow still runs.
+    The handler is resolved once per process, not on every call.
     """
-    try:
-        import llm_handler  # type: ignore
-        # Many users expose call_LLM at top-level; if not, try fallback names.
-        if hasattr(llm_handler, "call_LLM"):
-            return llm_handler.call_LLM(model, prompt)  # type: ignore
-        # Fallbacks if your wrapper uses different names:
-        if hasattr(llm_handler, "call_llm"):
-            return llm_handler.call_llm(model, prompt)  # type: ignore
-        if hasattr(llm_handler, "generate"):
-            return llm_handler.generate(model, prompt)  # type: ignore
-    except Exception:
-        pass
+    global _LLM_FN
+    if _LLM_FN is _UNRESOLVED:
+        _LLM_FN = _resolve_llm()
+    if _LLM_FN is not None:
+        try:
+            return _LLM_FN(model, prompt)
+        except Exception:
+            pass
     # Heuristic fallback
     return _heuristic_response(prompt)
 
@@ -53,10 +73,9 @@ def _heuristic_response(prompt: str) -> str:
     Very simple rule-based generator so you can test the negotiation without an LLM.
     Looks for numbers & keywords and nudges the price/delivery terms.
     """
-    import re
     # Extract last mentioned price and delivery days if any
-    price_match = re.search(r"\b(\d+(?:\.\d+)?)\s*(?:USD|usd|\$|THB)?\b", prompt)
-    days_match  = re.search(r"\b(\d+)\s*(?:day|days)\b", prompt)
+    price_match = _PRICE_RE.search(prompt)
+    days_match  = _DAYS_RE.search(prompt)
 
     # Defaults
     price = float(price_match.group(1)) if price_match else 100.0
@@ -134,7 +153,9 @@ def run_negotiation(
     }
 
     transcript = Transcript()
-    transcript.add("SYSTEM", f"Context:\n{format_ctx(ctx)}")
+    # ctx never changes during the negotiation; serialize it once for every prompt
+    ctx_text = format_ctx(ctx)
+    transcript.add("SYSTEM", f"Context:\n{ctx_text}")
     current_price = base_price
     current_delivery = delivery_days
 
@@ -142,7 +163,7 @@ def run_negotiation(
         # Payer proposes
         payer_prompt = (
             f"[PAYER] Round {r}: You represent the Payer.\n"
-            f"Context: {format_ctx(ctx)}\n"
+            f"Context: {ctx_text}\n"
             f"Last known terms -> price: {current_price:.2f}, delivery: {current_delivery} days.\n"
             f"Respond with a concise proposal including numeric 'price' and 'delivery days'."
         )
@@ -152,7 +173,7 @@ def run_negotiation(
         # Vendor counters (uses payer's message as the last proposal)
         vendor_prompt = (
             f"[VENDOR] Round {r}: You represent the Vendor.\n"
-            f"Context: {format_ctx(ctx)}\n"
+            f"Context: {ctx_text}\n"
             f"Payer said: {payer_msg}\n"
             f"Respond with a concise counterproposal including numeric 'price' and 'delivery days'."
         )
@@ -170,9 +191,8 @@ def run_negotiation(
         transcript.add("AUDITOR", auditor_msg)
 
         # Extract numbers heuristically from auditor_msg to carry to next round
-        import re
-        price_match = re.search(r"([0-9]+(?:\.[0-9]+)?)", auditor_msg)
-        days_match = re.search(r"(\d+)\s*days", auditor_msg, flags=re.I)
+        price_match = _NUM_RE.search(auditor_msg)
+        days_match = _AUDITOR_DAYS_RE.search(auditor_msg)
         if price_match:
             current_price = float(price_match.group(1))
         if days_match:
@@ -181,7 +201,7 @@ def run_negotiation(
     # Final settlement (auditor seals it)
     final_prompt = (
         f"[AUDITOR] Finalize settlement now based on last interim terms.\n"
-        f"Context: {format_ctx(ctx)}\n"
+        f"Context: {ctx_text}\n"
         f"Last interim -> price: {current_price:.2f}, delivery: {current_delivery} days.\n"
         f"Return strict JSON with keys: unit_price, quantity, delivery_days, total_value, notes."
     )
@@ -217,51 +237,64 @@ from datetime import datetime
 
 DB_PATH = os.getenv("DB_PATH", "./data/app.db")
 
+_NEGOTIATION_LOG_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS negotiation_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        payer TEXT,
+        vendor TEXT,
+        auditor TEXT,
+        transcript TEXT,
+        final_settlement TEXT
+    )
+"""
+
+_INSERT_NEGOTIATION_LOG_SQL = """
+    INSERT INTO negotiation_log (payer, vendor, auditor, transcript, final_settlement)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+# One connection per DB path, reused across negotiations (the table is created on open)
+_CONNS: Dict[str, sqlite3.Connection] = {}
+
+def _db(db_path: str) -> sqlite3.Connection:
+    conn = _CONNS.get(db_path)
+    if conn is None:
+        # WAL + NORMAL sync: the watcher and API read this DB while we write
+        conn = sqlite3.connect(db_path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute(_NEGOTIATION_LOG_SCHEMA_SQL)
+        conn.commit()
+        _CONNS[db_path] = conn
+    return conn
+
 def save_to_db(result: dict, db_path: str = DB_PATH) -> None:
     """Store negotiation transcript and final settlement."""
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS negotiation_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            payer TEXT,
-            vendor TEXT,
-            auditor TEXT,
-            transcript TEXT,
-            final_settlement TEXT
-        )
-    """)
-    conn.commit()
-
     payer = "PayerCo"
     vendor = "VendorLtd"
     auditor = "AuditBot"
     transcript_text = json.dumps(result["transcript"], ensure_ascii=False)
     settlement_text = json.dumps(result["final_settlement"], ensure_ascii=False)
 
-    c.execute("""
-        INSERT INTO negotiation_log (payer, vendor, auditor, transcript, final_settlement)
-        VALUES (?, ?, ?, ?, ?)
-    """, (payer, vendor, auditor, transcript_text, settlement_text))
-    conn.commit()
-    conn.close()
+    conn = _db(db_path)
+    with conn:
+        conn.execute(_INSERT_NEGOTIATION_LOG_SQL, (payer, vendor, auditor, transcript_text, settlement_text))
     print(f"[DB] Negotiation logged successfully at {datetime.now()}")
 
+def negotiation_params() -> Dict[str, Any]:
+    """run_negotiation keyword arguments from the environment toggles."""
+    return {
+        "model": os.getenv("MODEL", "openai"),
+        "rounds": int(os.getenv("ROUNDS", "3")),
+        "base_price": float(os.getenv("BASE_PRICE", "100")),
+        "quantity": int(os.getenv("QUANTITY", "100")),
+        "delivery_days": int(os.getenv("DELIVERY_DAYS", "7")),
+    }
+
 def main() -> None:
-    model = os.getenv("MODEL", "openai")
-    rounds = int(os.getenv("ROUNDS", "3"))
-    base_price = float(os.getenv("BASE_PRICE", "100"))
-    quantity = int(os.getenv("QUANTITY", "100"))
-    delivery_days = int(os.getenv("DELIVERY_DAYS", "7"))
-
-    result = run_negotiation(
-        model=model,
-        rounds=rounds,
-        base_price=base_price,
-        quantity=quantity,
-        delivery_days=delivery_days,
-    )
+    result = run_negotiation(**negotiation_params())
 
     print("\n=== NEGOTIATION TRANSCRIPT ===")
     for m in result["transcript"]:
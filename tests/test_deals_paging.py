@@ -0,0 +1,97 @@
+"""Regression checks for /api/deals keyset paging (run: python -m unittest)."""
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+try:
+    from fastapi import HTTPException
+
+    from backend.monitoring import deals_router
+except ImportError:  # fastapi not installed
+    deals_router = None
+
+# (deal_id, status, created_ts); ties on created_ts are broken by deal_id
+DEALS = [
+    ("d1", "settled", 100),
+    ("d2", "draft", 100),
+    ("d3", "settled", 200),
+    ("d4", "settled", 300),
+    ("d5", "draft", 300),
+]
+
+
+def _page(**kwargs):
+    params = {"limit": 2, "offset": 0, "status": None, "order": "desc", "cursor": None, "layout": "items"}
+    params.update(kwargs)
+    resp = deals_router.list_deals(**params)
+
+    async def body():
+        return b"".join([chunk async for chunk in resp.body_iterator])
+
+    return json.loads(asyncio.run(body()))
+
+
+@unittest.skipIf(deals_router is None, "fastapi not installed")
+class DealsKeysetPagingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmp.name, "app.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE deals (
+                    deal_id TEXT PRIMARY KEY, status TEXT NOT NULL, mode TEXT NOT NULL,
+                    buyer TEXT NOT NULL, seller TEXT NOT NULL, sku TEXT, qty REAL,
+                    unit_price REAL, vat_rate REAL, notional_ui REAL, commitment_json TEXT,
+                    created_ts INTEGER NOT NULL, finalized_ts INTEGER
+                )
+                """
+            )
+            conn.executemany(
+                "INSERT INTO deals (deal_id, status, mode, buyer, seller, created_ts) VALUES (?, ?, 'sim', 'a', 'b', ?)",
+                DEALS,
+            )
+        self._db_path = deals_router.DB_PATH
+        deals_router.DB_PATH = db_path
+        deals_router._INDEXES_READY = False
+
+    def tearDown(self):
+        deals_router.DB_PATH = self._db_path
+        self.tmp.cleanup()
+
+    def _walk(self, **kwargs):
+        """Follow next_cursor from the first page; return the deal ids seen, page by page."""
+        pages, cursor = [], None
+        while True:
+            page = _page(cursor=cursor, **kwargs)
+            pages.append([item["deal_id"] for item in page["items"]])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return pages
+
+    def test_cursor_walks_every_deal_once_in_order(self):
+        self.assertEqual(self._walk(), [["d5", "d4"], ["d3", "d2"], ["d1"]])
+        self.assertEqual(self._walk(order="asc"), [["d1", "d2"], ["d3", "d4"], ["d5"]])
+
+    def test_cursor_pages_within_a_status_filter(self):
+        self.assertEqual(self._walk(status="settled"), [["d4", "d3"], ["d1"]])
+
+    def test_next_cursor_is_last_row_key_and_null_on_a_short_page(self):
+        first = _page()
+        self.assertEqual(first["next_cursor"], "300:d4")
+        self.assertEqual(first["count"], 2)
+        last = _page(limit=10)
+        self.assertEqual(last["count"], len(DEALS))
+        self.assertIsNone(last["next_cursor"])
+
+    def test_malformed_cursor_is_a_400(self):
+        with self.assertRaises(HTTPException) as ctx:
+            _page(cursor="not-a-ts:d1")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
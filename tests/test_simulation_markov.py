@@ -0,0 +1,29 @@
+"""Regression checks for the Markov absorption model (run: python -m unittest)."""
+import math
+import unittest
+
+from backend.simulation.model import run_simulation
+
+PI = [[0.5, 0.3, 0.2], [0.2, 0.5, 0.3], [0.3, 0.2, 0.5]]
+
+
+def _markov(tau, ell, s0=(1, 1, 1)):
+    return run_simulation({
+        "tau": tau,
+        "markov": {"use": True, "pi": PI, "ell": list(ell), "s0": list(s0)},
+    })["markov"]
+
+
+class MarkovAbsorptionTest(unittest.TestCase):
+    def test_absorption_is_conserved_for_a_valid_chain(self):
+        for tau, ell in [(0.07, (0.3, 0.2, 0.1)), (0.5, (0.5, 0.1, 0.1)), (0.2, (0.8, 0.8, 0.8))]:
+            m = _markov(tau, ell)
+            self.assertTrue(math.isclose(m["aVAT"] + m["aLEAK"], 1.0, rel_tol=1e-9), (tau, ell, m))
+
+    def test_tau_plus_leakage_above_one_is_rejected(self):
+        with self.assertRaises(ValueError):
+            _markov(0.5, (0.9, 0.1, 0.1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Regression checks for the watcher's Transfer log decoding (run: python -m unittest)."""
+import os
+import sqlite3
+import tempfile
+import unittest
+from collections import OrderedDict
+
+try:
+    from hexbytes import HexBytes
+
+    from backend.watcher.watcher import TRANSFER_TOPIC, Watcher
+except ImportError:  # web3/hexbytes/requests not installed
+    Watcher = None
+
+BLOCK = 7
+BLOCK_TS = 1_700_000_014
+ZERO = "00" * 20
+PAYER = "11" * 20
+VENDOR = "ab" * 20
+TOKEN = "0x" + "22" * 20
+
+
+def _log(frm, to, value, data_as_text=False, extra_topics=()):
+    topics = [HexBytes(TRANSFER_TOPIC)] + [HexBytes(bytes(12) + bytes.fromhex(a)) for a in (frm, to)]
+    data = "0x%064x" % value if data_as_text else HexBytes(value.to_bytes(32, "big"))
+    return {
+        "transactionHash": HexBytes(bytes([value % 256]) * 32),
+        "blockNumber": BLOCK,
+        "topics": topics + [HexBytes(t) for t in extra_topics],
+        "data": data,
+    }
+
+
+@unittest.skipIf(Watcher is None, "watcher dependencies (web3, hexbytes) not installed")
+class RecordLogsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "app.db")
+        self.watcher = Watcher(self.db_path, "http://127.0.0.1:8545", TOKEN, tau=0.1)
+        self.watcher._init_db()
+        # Registered in mixed case: the lookup must still match the lowercase topic address
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO agents (wallet, type, province, tier, meta_json) VALUES (?, 'vendor', '', 2, '{}')",
+                ("0x" + VENDOR.upper(),),
+            )
+        # Header already cached, so no RPC is made
+        self.watcher._block_ts = OrderedDict({BLOCK: BLOCK_TS})
+
+    def tearDown(self):
+        self.watcher._close_db()
+        self.tmp.cleanup()
+
+    def _rows(self):
+        return self.watcher._db().execute(
+            "SELECT ts, block_number, from_address, to_address, amount_raw, amount_ui,"
+            " tier_from, tier_to, is_mint, eligible FROM transactions ORDER BY id"
+        ).fetchall()
+
+    def test_transfers_are_decoded_and_classified(self):
+        logs = [
+            _log(ZERO, PAYER, 5_000_000),
+            _log(PAYER, VENDOR, 2_000_000, data_as_text=True),
+            _log(PAYER, ZERO[:-2] + "33", 1_000_000),
+        ]
+        self.watcher._record_logs(logs, BLOCK)
+
+        self.assertEqual(
+            self._rows(),
+            [
+                (BLOCK_TS, BLOCK, "0x" + ZERO, "0x" + PAYER, 5_000_000, 5.0, -1, -1, 1, 0),
+                (BLOCK_TS, BLOCK, "0x" + PAYER, "0x" + VENDOR, 2_000_000, 2.0, -1, 2, 0, 1),
+                (BLOCK_TS, BLOCK, "0x" + PAYER, "0x" + ZERO[:-2] + "33", 1_000_000, 1.0, -1, -1, 0, 0),
+            ],
+        )
+        m = self.watcher._get_metrics()
+        self.assertAlmostEqual(m["m1_obs"], 7.0)
+        self.assertAlmostEqual(m["leakage"], 1.0)
+        self.assertAlmostEqual(m["vat_est"], 0.2)
+        self.assertEqual(m["last_block"], BLOCK)
+
+    def test_non_erc20_transfer_logs_are_skipped(self):
+        # ERC-721 Transfer: same signature, but the token id is a third indexed topic
+        self.watcher._record_logs([_log(PAYER, VENDOR, 9, extra_topics=[bytes(32)])], BLOCK)
+
+        self.assertEqual(self._rows(), [])
+        self.assertEqual(self.watcher._get_metrics()["last_block"], BLOCK)
+
+
+if __name__ == "__main__":
+    unittest.main()